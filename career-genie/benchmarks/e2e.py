@@ -0,0 +1,226 @@
+"""
+Offline end-to-end benchmark: drive every career-genie service against the mock
+LLM server and report throughput, latency percentiles and peak memory as JSON.
+
+The mock server (benchmarks/mock_llm_server.py) runs in its own process; the
+services use the real LLMInterface, failover policy and metrics, pointed at it.
+Every operation uses a distinct job description and the response cache is off,
+so each one reaches the (mock) provider.
+
+Usage (from the career-genie directory):
+
+    python benchmarks/e2e.py --requests 50 --concurrency 8 --output e2e.json
+    python benchmarks/e2e.py --stream --latency 0.5 --tokens-per-second 80 --rate-limit 0.05
+    python benchmarks/e2e.py --scenarios resume pack --export --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from mock_llm_server import add_arguments
+
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+COMPANY, TITLE, NAME = "Northwind", "Senior Backend Engineer", "Alex Morgan"
+CONTEXT = "Emphasise platform and data pipeline work."
+MESSAGE = "Hi Alex, we have a Senior Backend Engineer opening on our data platform team. Are you open to a chat?"
+
+
+async def consume(result):
+    """Await a coroutine or drain an async generator; returns the last value."""
+    if hasattr(result, "__anext__"):
+        last = None
+        async for last in result:
+            pass
+        return last
+    return await result
+
+
+def scenarios(services, stream, export):
+    """Name -> async operation(jd, index) covering every service."""
+    from services.utils import markdown_to_docx_and_pdf
+
+    suffix = "_stream_async" if stream else "_async"
+    resume_text = (FIXTURES / "sample-resume.md").read_text(encoding="utf-8")
+
+    def call(service, method, args):
+        return lambda jd, i: consume(getattr(getattr(services, service), method + suffix)(*args(jd, i)))
+
+    ops = {
+        "jdAnalysis": lambda jd, i: services.jd_analysis.analyze_async(jd, False),
+        "resume": call("resume", "generate", lambda jd, i: (jd, COMPANY, TITLE, CONTEXT, False)),
+        "coverLetter": call("cover_letter", "generate", lambda jd, i: (jd, COMPANY, TITLE, CONTEXT, False)),
+        "ats": call("ats", "check", lambda jd, i: (jd, COMPANY, TITLE, resume_text, False)),
+        "score": call("score", "check", lambda jd, i: (jd, False)),
+        "response": call("email", "response", lambda jd, i: (f"{MESSAGE} ({i})", False)),
+        "applyEmail": call("email", "apply_email", lambda jd, i: (TITLE, COMPANY, resume_text, jd, False)),
+        "interview": call("profile", "interview", lambda jd, i: (TITLE, jd, resume_text, False)),
+        "connection": call("profile", "linkedin_connection", lambda jd, i: (jd, resume_text, False)),
+        "aboutMe": call("profile", "linkedin_about_me", lambda jd, i: (f"{resume_text}\n<!-- {i} -->", False)),
+        "pack": lambda jd, i: consume(services.pack.run(jd, COMPANY, TITLE, CONTEXT, False)),
+        "localScore": lambda jd, i: asyncio.to_thread(
+            services.local_score.rank, [f"{jd}\n{n}" for n in range(100)]),
+    }
+    if export:
+        ops["export"] = lambda jd, i: markdown_to_docx_and_pdf(
+            f"{resume_text}\n\n<!-- {i} -->", NAME, TITLE, "resume", session=f"bench-{i % 4}")
+    return ops
+
+
+async def run_scenario(operation, jd, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await operation(f"{jd}\n\nReference: {i}-{time.time_ns()}", i)
+                latencies.append(time.perf_counter() - start)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - wall_start
+    return latencies, errors, wall
+
+
+def start_mock(args):
+    command = [sys.executable, str(ROOT / "benchmarks" / "mock_llm_server.py"), "--port", "0",
+               "--latency", str(args.latency), "--jitter", str(args.jitter),
+               "--tokens-per-second", str(args.tokens_per_second),
+               "--completion-tokens", str(args.completion_tokens),
+               "--rate-limit", str(args.rate_limit), "--retry-after", str(args.retry_after)]
+    if args.seed is not None:
+        command += ["--seed", str(args.seed)]
+    if args.prefill_tokens_per_second:
+        command += ["--prefill-tokens-per-second", str(args.prefill_tokens_per_second)]
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if not line:
+        raise RuntimeError("Mock LLM server failed to start")
+    return proc, line.strip().rsplit(" ", 1)[-1]
+
+
+def configure(url, export_dir, args):
+    from services.config import Config
+
+    config = Config()
+    llm = config.config['llm']
+    llm['use'] = 'mock'
+    llm['mock'] = {'url': url, 'apiKey': 'mock', 'deadline': args.deadline}
+    llm['failover'] = []
+    llm['cache'] = {'enabled': False}
+    llm.setdefault('metrics', {})['port'] = None
+    llm.setdefault('http', {})['maxConnections'] = max(100, args.concurrency * 2)
+    for name in ('resume', 'coverLetter', 'score'):
+        config.config['prompts'][name]['input']['baseResume'] = f"file://{FIXTURES / 'sample-resume.md'}"
+    config.config['export'] = {**config.config['export'], 'path': export_dir}
+    if args.pdf_backend:
+        config.config['export']['pdfBackend'] = args.pdf_backend
+    return config
+
+
+def mock_stats(url):
+    import urllib.request
+
+    with urllib.request.urlopen(url.rsplit("/v1", 1)[0] + "/stats", timeout=5) as response:
+        return json.loads(response.read())
+
+
+def git_commit():
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    return proc.stdout.strip() or None
+
+
+async def run(args, services):
+    from services.metrics import percentiles
+
+    ops = scenarios(services, args.stream, args.export)
+    selected = args.scenarios or list(ops)
+    jd = (FIXTURES / "sample-jd.md").read_text(encoding="utf-8")
+
+    results = []
+    for name in selected:
+        if name not in ops:
+            raise SystemExit(f"Unknown scenario '{name}'. Available: {', '.join(ops)}")
+        latencies, errors, wall = await run_scenario(ops[name], jd, args.requests, args.concurrency)
+        summary = {key: round(value, 4) for key, value in percentiles(latencies).items() if key != "count"}
+        results.append({
+            "scenario": name,
+            "requests": args.requests,
+            "ok": len(latencies),
+            "errors": len(errors),
+            "firstError": errors[0] if errors else None,
+            "throughputPerSecond": round(len(latencies) / wall, 3) if wall else None,
+            "latencySeconds": summary,
+            # ru_maxrss is the process peak so far, in KiB on Linux
+            "peakRssMiB": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        })
+        print(f"{name:<12} ok={len(latencies):<4} errors={len(errors):<3} "
+              f"rps={results[-1]['throughputPerSecond']} p50={summary.get('p50')} p95={summary.get('p95')} "
+              f"p99={summary.get('p99')}", flush=True)
+    await services.llm.aclose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", help="Subset of scenarios to run (default: all)")
+    parser.add_argument("--requests", type=int, default=20, help="Operations per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stream", action="store_true", help="Use the *_stream_async service methods")
+    parser.add_argument("--export", action="store_true", help="Include DOCX/PDF export (needs pandoc)")
+    parser.add_argument("--pdf-backend", help="Override export.pdfBackend for the export scenario")
+    parser.add_argument("--deadline", type=float, default=60, help="Per-request deadline against the mock")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    mock, url = start_mock(args)
+    try:
+        with tempfile.TemporaryDirectory() as export_dir:
+            from services.factory import Services
+            from services.utils import set_export_config
+
+            config = configure(url, export_dir, args)
+            services = Services(config)
+            set_export_config(config.get('export'))
+
+            start = time.perf_counter()
+            results = asyncio.run(run(args, services))
+            wall = time.perf_counter() - start
+
+        report = {
+            "commit": git_commit(),
+            "settings": {key: value for key, value in vars(args).items() if key != "output"},
+            "wallSeconds": round(wall, 3),
+            "peakRssMiB": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+            "mock": mock_stats(url),
+            "scenarios": results,
+            "llm": services.metrics.summary(),
+        }
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps({key: report[key] for key in ("commit", "wallSeconds", "peakRssMiB", "mock")}))
+
+
+if __name__ == "__main__":
+    main()
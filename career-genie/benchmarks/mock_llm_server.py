@@ -0,0 +1,219 @@
+"""
+OpenAI-compatible stub server for offline benchmarks.
+
+Serves `POST /v1/chat/completions` (plain and SSE streaming) with a configurable
+time to first token, jitter, token rate and share of 429 responses, plus
+`GET /v1/models` and `GET /stats` (request counters). With a prefill rate set,
+it also simulates a prompt prefix cache: only the part of a prompt not shared
+with a recent prompt costs prefill time, and the shared part is reported as
+`usage.prompt_tokens_details.cached_tokens`.
+
+Usage (from the career-genie directory):
+
+    python benchmarks/mock_llm_server.py --port 8088 --latency 0.3 --jitter 0.1 --tokens-per-second 200
+    python benchmarks/mock_llm_server.py --port 0 --rate-limit 0.05   # prints the chosen port
+
+Point `llm.<provider>.url` at `http://127.0.0.1:<port>/v1` to use it.
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("Led design and delivery of scalable data platforms with Python, Spark and AWS, "
+         "improving reliability and cutting costs across teams").split()
+
+
+class MockSettings:
+    def __init__(self, latency=0.2, jitter=0.05, tokens_per_second=150.0, completion_tokens=200,
+                 rate_limit=0.0, retry_after=1.0, seed=None, prefill_tokens_per_second=0.0, prefix_cache=8):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.prompts = deque(maxlen=prefix_cache)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "streamed": 0, "rateLimited": 0, "completionTokens": 0, "cachedPromptTokens": 0}
+
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def first_token_delay(self):
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def prefill(self, prompt):
+        """Simulated prefill: returns (seconds, cached prompt tokens) given the longest prefix shared with a recent prompt."""
+        if not self.prefill_tokens_per_second:
+            return 0.0, 0
+        with self.lock:
+            shared = max((len(os.path.commonprefix([prompt, p])) for p in self.prompts), default=0)
+            self.prompts.append(prompt)
+            cached = shared // 4
+            self.stats["cachedPromptTokens"] += cached
+        return max(0, len(prompt) // 4 - cached) / self.prefill_tokens_per_second, cached
+
+    def throttled(self):
+        with self.lock:
+            return self.random.random() < self.rate_limit
+
+
+def make_handler(settings):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def handle(self):
+            try:
+                super().handle()
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up on the request, e.g. a cancelled prefetch
+                pass
+
+        def do_GET(self):
+            if self.path.rstrip("/").endswith("/models"):
+                self.send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+            elif self.path == "/stats":
+                with settings.lock:
+                    self.send_json(200, dict(settings.stats))
+            else:
+                self.send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self.send_json(404, {"error": {"message": "not found"}})
+                return
+
+            settings.count("requests")
+            if settings.throttled():
+                settings.count("rateLimited")
+                self.send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                               {"Retry-After": str(settings.retry_after)})
+                return
+
+            prompt = "".join(str(m.get("content", "")) for m in request.get("messages", []))
+            prompt_tokens = max(1, len(prompt) // 4)
+            tokens = int(request.get("max_tokens") or settings.completion_tokens)
+            model = request.get("model", "mock")
+            prefill, cached = settings.prefill(prompt)
+            time.sleep(settings.first_token_delay() + prefill)
+
+            if request.get("stream"):
+                settings.count("streamed")
+                self.stream(model, tokens, prompt_tokens, cached, (request.get("stream_options") or {}).get("include_usage"))
+            else:
+                time.sleep(tokens / settings.tokens_per_second)
+                text = " ".join(WORDS[i % len(WORDS)] for i in range(tokens))
+                self.send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                    "usage": usage(prompt_tokens, tokens, cached),
+                })
+            settings.count("completionTokens", tokens)
+
+        def stream(self, model, tokens, prompt_tokens, cached, include_usage):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+            def event(choices, extra=None):
+                payload = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                           "model": model, "choices": choices, **(extra or {})}
+                self.write_chunk(f"data: {json.dumps(payload)}\n\n")
+
+            interval = 1 / settings.tokens_per_second
+            for i in range(tokens):
+                event([{"index": 0, "delta": {"content": WORDS[i % len(WORDS)] + " "}, "finish_reason": None}])
+                time.sleep(interval)
+            event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if include_usage:
+                event([], {"usage": usage(prompt_tokens, tokens, cached)})
+            self.write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def write_chunk(self, text):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def send_json(self, status, body, headers=None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def usage(prompt_tokens, completion_tokens, cached_tokens=0):
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": cached_tokens}}
+
+
+def start(settings, port=0, host="127.0.0.1"):
+    """Start the stub in a daemon thread; returns the server (`server.server_port` holds the port)."""
+    server = ThreadingHTTPServer((host, port), make_handler(settings))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser):
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds before the first token")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Uniform +/- jitter on the latency")
+    parser.add_argument("--tokens-per-second", type=float, default=150.0)
+    parser.add_argument("--completion-tokens", type=int, default=200, help="Tokens per response unless max_tokens is set")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with a 429")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=0.0,
+                        help="Simulate prompt processing (and a prefix cache) at this rate; 0 disables it")
+
+
+def settings_from(args):
+    return MockSettings(args.latency, args.jitter, args.tokens_per_second, args.completion_tokens,
+                        args.rate_limit, args.retry_after, args.seed, args.prefill_tokens_per_second)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8088)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = start(settings_from(args), args.port, args.host)
+    print(f"Mock LLM server listening on http://{args.host}:{server.server_port}/v1", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
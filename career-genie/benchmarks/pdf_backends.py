@@ -0,0 +1,123 @@
+"""
+Compare PDF export backends on render latency and peak memory.
+
+Each backend runs in its own worker process so that peak RSS (including the
+pandoc / TeX / wkhtmltopdf children it spawns) is attributed to that backend.
+
+Usage (from the career-genie directory):
+
+    python benchmarks/pdf_backends.py --runs 10 --concurrency 4
+    python benchmarks/pdf_backends.py --backends html --input data/base-resume.md
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+DEFAULT_INPUTS = [str(ROOT / "benchmarks" / "fixtures" / "sample-resume.md")]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_worker(backend_name, inputs, runs, concurrency):
+    from services.config import Config
+    from services.pdf_backends import BACKENDS
+
+    export_config = dict(Config().get('export'))
+    export_config['pdfBackend'] = backend_name
+
+    setup_start = time.perf_counter()
+    backend = BACKENDS[backend_name](export_config)
+    setup = time.perf_counter() - setup_start
+
+    documents = [Path(path).read_text(encoding="utf-8") for path in inputs]
+    jobs = [documents[i % len(documents)] for i in range(runs)]
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        def render(indexed):
+            index, md_text = indexed
+            start = time.perf_counter()
+            backend.render(md_text, str(Path(out_dir) / f"{index}.pdf"))
+            return time.perf_counter() - start
+
+        # Warm-up render so one-off costs (font caches, binary load) are excluded
+        render((-1, documents[0]))
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(render, enumerate(jobs)))
+        wall = time.perf_counter() - wall_start
+
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "backend": backend_name,
+        "runs": runs,
+        "concurrency": concurrency,
+        "setupSeconds": round(setup, 4),
+        "meanSeconds": round(statistics.mean(latencies), 4),
+        "p50Seconds": round(percentile(latencies, 50), 4),
+        "p95Seconds": round(percentile(latencies, 95), 4),
+        "maxSeconds": round(max(latencies), 4),
+        "throughputPerSecond": round(runs / wall, 3),
+        # ru_maxrss is reported in KiB on Linux
+        "peakRssMiB": round(own / 1024, 1),
+        "peakChildRssMiB": round(children / 1024, 1),
+    }
+
+
+def main():
+    from services.pdf_backends import BACKENDS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=sorted(BACKENDS), choices=sorted(BACKENDS))
+    parser.add_argument("--input", nargs="+", default=DEFAULT_INPUTS, help="Markdown resumes to render")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.input, args.runs, args.concurrency)))
+        return
+
+    results = []
+    for backend in args.backends:
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", backend, "--runs", str(args.runs),
+             "--concurrency", str(args.concurrency), "--input", *args.input],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            results.append({"backend": backend, "error": proc.stderr.strip().splitlines()[-1:]})
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'backend':<8} {'mean s':>8} {'p50 s':>8} {'p95 s':>8} {'docs/s':>8} {'rss MiB':>8} {'child MiB':>10}")
+    for r in results:
+        if "error" in r:
+            print(f"{r['backend']:<8} failed: {r['error']}")
+            continue
+        print(f"{r['backend']:<8} {r['meanSeconds']:>8} {r['p50Seconds']:>8} {r['p95Seconds']:>8} "
+              f"{r['throughputPerSecond']:>8} {r['peakRssMiB']:>8} {r['peakChildRssMiB']:>10}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
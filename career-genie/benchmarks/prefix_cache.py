@@ -0,0 +1,191 @@
+"""
+Show the effect of prompt prefix caching on a local LLM server.
+
+Builds the resume prompt (data/prompts/resume-update.md) through `Resume.format_prompt`
+for a series of different job descriptions and compares the time to first token
+of three layouts:
+
+- stable-first: instructions and base resume first, the job-specific part last
+  (the layout of the shipped prompts), with the base resume reduced to its token
+  budget without the JD, as on a local server, so consecutive calls share a long prefix
+- per-jd-selection: the same layout, but the base resume reduced to the sections
+  most relevant to each JD, as for hosted providers, so the prefix breaks inside it
+- variable-first: the job-specific part first, as the prompts used to be laid out,
+  so every call has to process the whole prompt again
+
+The base resume is the sample resume padded with project sections to
+`--resume-tokens` (by default twice its `prompts.resume.budget.base_resume`), so it
+has to be reduced, and each job description stresses a different technology.
+Each request asks for a single token, so the time is dominated by prompt
+processing. The first request of each layout is reported apart, as it also pays
+for loading the model and filling the cache.
+
+Usage (from the career-genie directory):
+
+    python benchmarks/prefix_cache.py                          # llm.local url and model from data/config.json
+    python benchmarks/prefix_cache.py --url http://localhost:8080/v1 --model qwen2.5:7b --variants 12
+    python benchmarks/prefix_cache.py --mock                   # offline, against the simulated prefix cache
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+COMPANIES = ["Northwind", "Contoso", "Fabrikam", "Tailspin", "Litware", "Adatum", "Proseware", "Wingtip",
+             "Woodgrove", "Lucerne", "Margie", "Trey"]
+TOPICS = ["Kafka streaming", "React dashboards", "Terraform modules", "PostgreSQL tuning", "Kubernetes operators",
+          "BigQuery analytics", "gRPC APIs", "Redis caching", "incident response", "Django admin tooling",
+          "machine learning pipelines", "Elasticsearch search"]
+MARKER = "Target role:"
+
+
+class Llm:
+    """Stands in for `LLMInterface` when only prompts are formatted."""
+
+    def __init__(self, use_local):
+        self.use_local = use_local
+
+
+def padded_resume(base_resume, tokens):
+    """The base resume with a project section per topic appended until it is about `tokens` long."""
+    from services.prompt_budget import estimate_tokens
+
+    sections, i = [base_resume, "## Selected Projects"], 0
+    while estimate_tokens("\n\n".join(sections)) < tokens:
+        topic = TOPICS[i % len(TOPICS)]
+        sections.append(
+            f"### {topic.title()} project {i + 1}\n\n"
+            f"- Designed and shipped {topic} for a platform team, owning the work from proposal to on-call.\n"
+            f"- Cut latency and cost of the {topic} stack by measuring first and fixing the largest bottleneck.\n"
+            f"- Wrote the runbooks and onboarding guide for {topic}; three teams adopted the setup.")
+        i += 1
+    return "\n\n".join(sections)
+
+
+def layouts(variants, resume_tokens=None):
+    """Prompts of every layout for `variants` job descriptions, and the base resume's token count."""
+    from services.config import Config
+    from services.prompt_budget import estimate_tokens
+    from services.resume import Resume
+    from services.templates import registry
+
+    config = dict(Config().get('prompts.resume'))
+    template = registry.get(config['prompt'])
+    if MARKER not in template:
+        raise SystemExit(f"resume-update.md has no '{MARKER}' line to split the stable part from the job-specific one")
+    budget = int((config.get('budget') or {}).get('base_resume') or 1500)
+    base_resume = padded_resume((FIXTURES / "sample-resume.md").read_text(encoding="utf-8"),
+                                resume_tokens or 2 * budget)
+    config['input'] = dict(config['input'], baseResume=base_resume)
+    config.pop('incremental', None)
+    jd = (FIXTURES / "sample-jd.md").read_text(encoding="utf-8")
+    local, hosted = Resume(config, Llm(True), None), Resume(config, Llm(False), None)
+
+    prompts = {"stable-first": [], "per-jd-selection": [], "variable-first": []}
+    for i in range(variants):
+        company, topic = COMPANIES[i % len(COMPANIES)], TOPICS[i % len(TOPICS)]
+        job = f"{company} {i} is hiring. The role focuses on {topic}; deep {topic} experience is a must.\n\n{jd}"
+        args = (job, f"{company} {i}", "Senior Backend Engineer", "", f"{topic}, Python, Kafka, AWS")
+        stable = local.format_prompt(*args)
+        prompts["stable-first"].append(stable)
+        prompts["per-jd-selection"].append(hosted.format_prompt(*args))
+        head, tail = stable.split(MARKER, 1)
+        prompts["variable-first"].append(MARKER + tail + "\n\n" + head)
+    return prompts, estimate_tokens(base_resume), budget
+
+
+def first_token(client, model, prompt):
+    """Seconds until the first streamed chunk, and the cached prompt tokens if the server reports them."""
+    start = time.perf_counter()
+    ttft, cached = None, None
+    stream = client.chat.completions.create(
+        model=model, messages=[{"role": "user", "content": prompt}], max_tokens=1, temperature=0,
+        stream=True, stream_options={"include_usage": True})
+    for chunk in stream:
+        if ttft is None and chunk.choices:
+            ttft = time.perf_counter() - start
+        details = getattr(chunk.usage, "prompt_tokens_details", None) if chunk.usage else None
+        if details is not None:
+            cached = getattr(details, "cached_tokens", None)
+    return ttft if ttft is not None else time.perf_counter() - start, cached
+
+
+def start_mock():
+    command = [sys.executable, str(ROOT / "benchmarks" / "mock_llm_server.py"), "--port", "0",
+               "--latency", "0.02", "--jitter", "0", "--prefill-tokens-per-second", "800"]
+    proc = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = proc.stdout.readline()
+    if not line:
+        raise RuntimeError("Mock LLM server failed to start")
+    return proc, line.strip().rsplit(" ", 1)[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="OpenAI-compatible base URL (default: llm.local.url)")
+    parser.add_argument("--model", help="Model name (default: llm.local.model)")
+    parser.add_argument("--variants", type=int, default=8, help="Distinct job descriptions per layout")
+    parser.add_argument("--resume-tokens", type=int,
+                        help="Size of the padded base resume (default: twice its token budget)")
+    parser.add_argument("--mock", action="store_true", help="Run against the mock server's simulated prefix cache")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    from openai import OpenAI
+    from services.config import Config
+
+    os.chdir(ROOT)
+    local = Config().get('llm').get('local') or {}
+    mock = None
+    url, model = args.url or local.get('url', 'http://localhost:11434/v1'), args.model or local.get('model')
+    if args.mock:
+        mock, url = start_mock()
+        model = model or "mock"
+
+    try:
+        client = OpenAI(base_url=url, api_key="not-required", max_retries=0, timeout=600)
+        prompts_by_layout, resume_tokens, budget = layouts(args.variants, args.resume_tokens)
+        report = {"url": url, "model": model, "variants": args.variants, "resumeTokens": resume_tokens,
+                  "budgetTokens": budget, "layouts": {}}
+        for name, prompts in prompts_by_layout.items():
+            timings = [first_token(client, model, prompt) for prompt in prompts]
+            warm = [ttft for ttft, _ in timings[1:]]
+            cached = [tokens for _, tokens in timings[1:] if tokens is not None]
+            report["layouts"][name] = {
+                "firstSeconds": round(timings[0][0], 4),
+                "p50Seconds": round(statistics.median(warm), 4) if warm else None,
+                "meanSeconds": round(statistics.mean(warm), 4) if warm else None,
+                "cachedPromptTokens": round(statistics.mean(cached)) if cached else None,
+                "promptChars": round(statistics.mean(len(p) for p in prompts)),
+            }
+    finally:
+        if mock is not None:
+            mock.terminate()
+            mock.wait()
+
+    print(f"base resume of ~{resume_tokens} tokens, budget {budget}")
+    print(f"{'layout':<16} {'first s':>8} {'p50 s':>8} {'mean s':>8} {'cached tok':>11}")
+    for name, stats in report["layouts"].items():
+        print(f"{name:<16} {stats['firstSeconds']:>8} {str(stats['p50Seconds']):>8} "
+              f"{str(stats['meanSeconds']):>8} {str(stats['cachedPromptTokens']):>11}")
+    stable = report["layouts"]["stable-first"]["p50Seconds"]
+    for name, key in (("variable-first", "speedup"), ("per-jd-selection", "selectionSpeedup")):
+        other = report["layouts"][name]["p50Seconds"]
+        if stable and other:
+            report[key] = round(other / stable, 2)
+            print(f"stable-first prompts reach the first token {report[key]}x faster than {name} (p50)")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
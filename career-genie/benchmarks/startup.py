@@ -0,0 +1,121 @@
+"""
+Measure career-genie cold start: how long a fresh process takes to import the
+app, create the services and validate the templates, build the UI, and
+(separately) to preload the local models.
+
+Every run is a new interpreter, as for a freshly scheduled container replica.
+
+Usage (from the career-genie directory):
+
+    python benchmarks/startup.py --runs 10
+    python benchmarks/startup.py --runs 5 --max-ready 3.0 --output startup.json
+
+With `--max-ready` the script exits non-zero when the median time until the UI
+is ready exceeds the limit, so it can guard against startup regressions in CI.
+"""
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+PHASES = ["importSeconds", "servicesSeconds", "uiSeconds", "readySeconds", "warmSeconds"]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_worker():
+    start = time.perf_counter()
+    import app
+    from services.config import Config
+    imported = time.perf_counter()
+
+    config = Config()
+    services = app.Services(config)
+    services.validate()
+    built = time.perf_counter()
+
+    app.build_ui(services, config)
+    ready = time.perf_counter()
+
+    # What the background warm-up thread does after launch; reported apart from readiness
+    warm_error = None
+    try:
+        services.warm()
+    except Exception as e:  # e.g. no API key in this environment
+        warm_error = str(e)
+    warmed = time.perf_counter()
+
+    return {
+        "importSeconds": round(imported - start, 4),
+        "servicesSeconds": round(built - imported, 4),
+        "uiSeconds": round(ready - built, 4),
+        "readySeconds": round(ready - start, 4),
+        "warmSeconds": None if warm_error else round(warmed - ready, 4),
+        "warmError": warm_error,
+        # ru_maxrss is reported in KiB on Linux
+        "peakRssMiB": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "modules": len(sys.modules),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ready", type=float, help="Fail when the median readySeconds exceeds this")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker()))
+        return
+
+    runs = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, __file__, "--worker"], cwd=ROOT, capture_output=True, text=True)
+        if proc.returncode != 0:
+            sys.exit(f"Startup failed:\n{proc.stderr.strip()}")
+        run = json.loads(proc.stdout.strip().splitlines()[-1])
+        run["processSeconds"] = round(time.perf_counter() - start, 4)
+        runs.append(run)
+
+    report = {"runs": args.runs}
+    for phase in PHASES + ["processSeconds"]:
+        values = [run[phase] for run in runs if run[phase] is not None]
+        if not values:
+            report[phase] = {"p50": None, "p95": None, "max": None, "error": runs[0].get("warmError")}
+            continue
+        report[phase] = {
+            "p50": round(statistics.median(values), 4),
+            "p95": round(percentile(values, 95), 4),
+            "max": round(max(values), 4),
+        }
+    report["peakRssMiB"] = max(run["peakRssMiB"] for run in runs)
+    report["modules"] = max(run["modules"] for run in runs)
+
+    print(f"{'phase':<16} {'p50 s':>8} {'p95 s':>8} {'max s':>8}")
+    for phase in PHASES + ["processSeconds"]:
+        stats = report[phase]
+        print(f"{phase:<16} {str(stats['p50']):>8} {str(stats['p95']):>8} {str(stats['max']):>8}")
+    print(f"peak RSS {report['peakRssMiB']} MiB, {report['modules']} modules loaded")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    if args.max_ready is not None and report["readySeconds"]["p50"] > args.max_ready:
+        sys.exit(f"Startup regression: median readySeconds {report['readySeconds']['p50']} > {args.max_ready}")
+
+
+if __name__ == "__main__":
+    main()
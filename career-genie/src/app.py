@@ -1,180 +1,352 @@
+import asyncio
+import contextlib
+import threading
+
 import gradio as gr
-import json, sys, os
 
-from services.llm_interface import LLMInterface
-from services.email_response import EmailResponse
-from services.resume import Resume
-from services.ats import AtsCheck
+from services.admission import Busy, create_gates
 from services.config import Config
-from services.profile import Profile
-from services.base_resume_score import BaseScore
-from services.utils import cleanup, markdown_to_docx_and_pdf, set_export_config
-
-config = Config()
-
-llm=LLMInterface(config.get('llm'))
-email=EmailResponse(config.get('prompts.responses'), llm)
-resume=Resume(config.get('prompts.resume'), llm)
-cv=Resume(config.get('prompts.coverLetter'), llm)
-ats=AtsCheck(config.get('prompts.ats'), llm)
-profile=Profile(config.get('prompts.profile'), llm)
-score=BaseScore(config.get('prompts.score'), llm)
-
-# Cleanup export folder with all files having extensions like .md, .docx & .pdf before starting
-cleanup(config.get('export.path'))
-set_export_config(config.get('export'))
-
-with gr.Blocks(
-    title="Career Genie"
-    ) as demo:
-    gr.Markdown(f"\
-    # 🤖 Career Genie - AI-Powered Job Applications & Career Tools \
-    \n\n### Craft high-impact resumes, cover letters, and recruiter responses with AI built for job seekers.\
-    \n\nTo get started enter the name desired company to apply and the role/designation you want to apply for")
-    with gr.Row():
-        with gr.Column():
-            candidate = gr.Textbox(label="Your Name")
-        with gr.Column():
-            company = gr.Textbox(label="Company")
-        with gr.Column():
-            title = gr.Textbox(label="Role/Designation")
-
-    with gr.Tab('Resume & Cover Letter'):
+from services.ensemble import format_ensemble
+from services.factory import Services
+from services.local_score import format_ranking, split_jds
+from services.metrics import serve as serve_metrics
+from services.pipeline import format_progress
+from services.templates import registry
+from services.utils import markdown_to_docx_and_pdf, set_export_config
+
+PACK_OUTPUTS = ["resume", "coverLetter", "score", "ats", "applyEmail", "interview", "aboutMe", "connection"]
+
+@contextlib.asynccontextmanager
+async def admitted(gate):
+    """Hold a slot of `gate`; shows the queue position while waiting and an error when it is full."""
+    try:
+        async with gate.admit(lambda position: gr.Info(f"Queued: position {position} for {gate.name}")):
+            yield
+    except Busy as e:
+        raise gr.Error(str(e))
+
+def stream(services, service, method, gate, render=None, fan_out=False):
+    """
+    Streaming handler for `services.<service>.<method>`, admitted through `gate`.
+
+    The service is looked up on the first click rather than when the UI is built,
+    so building the UI does not create services or import the OpenAI client.
+    With `fan_out`, the method runs several LLM calls at once and is passed
+    `admit=` to take a slot of `gate` for each of them instead of one for the run.
+    """
+    async def handler(*args):
+        call = getattr(getattr(services, service), method)
+        if fan_out:
+            async for partial in call(*args, admit=lambda: admitted(gate)):
+                yield render(partial) if render else partial
+            return
+        async with admitted(gate):
+            async for partial in call(*args):
+                yield render(partial) if render else partial
+    return handler
+
+def drafter(services, gate, incremental=False):
+    """
+    Resume handler that also keeps the inputs it generated from in a `gr.State`.
+
+    With `incremental`, the current resume and that state go to `Resume.revise`,
+    which regenerates only the sections affected by the changed JD or context.
+    Those sections run concurrently, so it takes a slot of `gate` for each LLM
+    call, like the `fan_out` handlers of `stream`, instead of one for the run.
+    """
+    async def handler(resume, draft, jd, company, title, context, use_cache):
+        if incremental:
+            partials = services.resume.revise_stream_async(resume, draft, jd, company, title, context, use_cache,
+                                                           admit=lambda: admitted(gate))
+            async for partial in partials:
+                yield partial, gr.update()
+        else:
+            async with admitted(gate):
+                async for partial in services.resume.generate_stream_async(jd, company, title, context, use_cache):
+                    yield partial, gr.update()
+        yield gr.update(), services.resume.draft(jd, company, title, context)
+    return handler
+
+def prefetcher(services, gate):
+    """Start the JD analysis and base resume score in the background once the pasted JD settles."""
+    async def prefetch(jd, request: gr.Request):
+        # Speculative work takes a free LLM slot or none: it never queues ahead of a click
+        services.prefetch.schedule(request.session_hash, jd, admit=lambda: gate.admit(wait=False))
+    return prefetch
+
+def ranker(services, gate):
+    async def rank_jds(text):
+        jds = split_jds(text)
+        if not jds:
+            return ""
+        async with admitted(gate):
+            results = await asyncio.to_thread(services.local_score.rank, jds)
+        return format_ranking(results, jds)
+    return rank_jds
+
+def exporter(gate):
+    async def export(md_text, name, role, export_type, request: gr.Request):
+        async with admitted(gate):
+            # Each browser session downloads from its own folder of the export store
+            return await markdown_to_docx_and_pdf(md_text, name, role, export_type, session=request.session_hash)
+    return export
+
+def format_pack(results):
+    return [format_progress(results)] + [
+        results[name].output if results[name].status == "done" else gr.update()
+        for name in PACK_OUTPUTS
+    ]
+
+def build_ui(services, config):
+    # LLM-bound, CPU-bound export and cheap handlers each get their own limit and queue
+    gates = create_gates(config.get('ui.groups'))
+    llm, export = gates['llm'], exporter(gates['export'])
+
+    with gr.Blocks(
+        title="Career Genie"
+        ) as demo:
+        gr.Markdown(f"\
+        # 🤖 Career Genie - AI-Powered Job Applications & Career Tools \
+        \n\n### Craft high-impact resumes, cover letters, and recruiter responses with AI built for job seekers.\
+        \n\nTo get started enter the name desired company to apply and the role/designation you want to apply for")
         with gr.Row():
             with gr.Column():
-                context = gr.Textbox(label="Context", lines=10, max_lines=10)
-                resume_btn = gr.Button("Generate Resume")
-            with gr.Column():                
-                jd_input = gr.Textbox(label="Job Description", lines=10, max_lines=10)
-                cover_letter_btn = gr.Button("Generate Cover Letter")
+                candidate = gr.Textbox(label="Your Name")
+            with gr.Column():
+                company = gr.Textbox(label="Company")
+            with gr.Column():
+                title = gr.Textbox(label="Role/Designation")
             with gr.Column():
-                base_resume = gr.Textbox(label="Base Resume in Markdown", value=resume.get_resume(), lines=5, max_lines=10)
-                ats_chec_btn = gr.Button("ATS Check & Flaw Report")
-        
-        with gr.Tab('Resume'):
+                use_cache = gr.Checkbox(label="Use cached responses", value=True)
+
+        with gr.Tab('Resume & Cover Letter'):
             with gr.Row():
                 with gr.Column():
-                    export_resume_btn = gr.Button("Export To PDF & DOCX")
-                with gr.Column():
-                    export_resume_to_docx = gr.File(label="Download Resume.DOCX", elem_classes=["file-download"])
+                    context = gr.Textbox(label="Context", lines=10, max_lines=10)
+                    resume_btn = gr.Button("Generate Resume")
+                    revise_btn = gr.Button("Update Changed Sections")
+                with gr.Column():                
+                    jd_input = gr.Textbox(label="Job Description", lines=10, max_lines=10)
+                    cover_letter_btn = gr.Button("Generate Cover Letter")
                 with gr.Column():
-                    export_resume_to_pdf = gr.File(label="Download Resume.PDF", elem_classes=["file-download"])
+                    base_resume = gr.Textbox(label="Base Resume in Markdown", value=registry.get(config.get('prompts.resume.input.baseResume')), lines=5, max_lines=10)
+                    ats_chec_btn = gr.Button("ATS Check & Flaw Report")
+                    ats_ensemble_btn = gr.Button("ATS Ensemble Check")
+
+            with gr.Tab('Resume'):
+                with gr.Row():
+                    with gr.Column():
+                        export_resume_btn = gr.Button("Export To PDF & DOCX")
+                    with gr.Column():
+                        export_resume_to_docx = gr.File(label="Download Resume.DOCX", elem_classes=["file-download"])
+                    with gr.Column():
+                        export_resume_to_pdf = gr.File(label="Download Resume.PDF", elem_classes=["file-download"])
+
+                with gr.Row():
+                    with gr.Column():
+                        resume_output = gr.Textbox(label="Generated Resume", lines=10)
+                        # Inputs the resume above was generated from, for incremental updates
+                        resume_draft = gr.State(None)
+                    with gr.Column():
+                        resume_output_mdv = gr.Markdown(label="Generated Cover Letter",  buttons=["copy"])
+                        resume_output.change(fn=lambda x: x, inputs=resume_output, outputs=resume_output_mdv)
+
+            with gr.Tab('Cover Letter'):
+                with gr.Row():
+                    with gr.Column():
+                        export_cvl_btn = gr.Button("Export To PDF & DOCX")
+                    with gr.Column():
+                        export_cvl_to_docx = gr.File(label="Download CoverLetter.DOCX", elem_classes=["file-download"])
+                    with gr.Column():
+                        export_cvl_to_pdf = gr.File(label="Download CoverLetter.PDF", elem_classes=["file-download"])
+
+                with gr.Row():
+                    with gr.Column():
+                        cover_letter_op = gr.Textbox(label="Generated Cover Letter", lines=10)
+                    with gr.Column():
+                        cover_letter_op_mdv = gr.Markdown(label="Generated Cover Letter",  buttons=["copy"])
+                        cover_letter_op.change(fn=lambda x: x, inputs=cover_letter_op, outputs=cover_letter_op_mdv)
+
+            with gr.Tab("Base Resume Score"):
+                with gr.Row():
+                    score_btn = gr.Button("Get Score")
+                with gr.Row():
+                    mdv_score = gr.Markdown(label="Generated Score",  buttons=["copy"])
+
+            with gr.Tab('ATS Check'):
+                ats_chec_op_mdv = gr.Markdown(label="ATS Check",  buttons=["copy"])
 
+            ats_chec_btn.click(
+                fn=stream(services, 'ats', 'check_stream_async', llm),
+                inputs=[jd_input, company, title, resume_output, use_cache],
+                outputs=ats_chec_op_mdv,
+                concurrency_limit=None
+            )
+
+            ats_ensemble_btn.click(
+                fn=stream(services, 'ats', 'ensemble_stream_async', llm, format_ensemble, fan_out=True),
+                inputs=[jd_input, company, title, resume_output, use_cache],
+                outputs=ats_chec_op_mdv,
+                concurrency_limit=None
+            )
+
+            resume_btn.click(
+                fn=drafter(services, llm),
+                inputs=[resume_output, resume_draft, jd_input, company, title, context, use_cache],
+                outputs=[resume_output, resume_draft],
+                concurrency_limit=None
+            )
+            revise_btn.click(
+                fn=drafter(services, llm, incremental=True),
+                inputs=[resume_output, resume_draft, jd_input, company, title, context, use_cache],
+                outputs=[resume_output, resume_draft],
+                concurrency_limit=None
+            )
+            cover_letter_btn.click(
+                stream(services, 'cover_letter', 'generate_stream_async', llm),
+                inputs=[jd_input, company, title, context, use_cache],
+                outputs=cover_letter_op,
+                concurrency_limit=None
+            )
+            export_resume_btn.click(
+                export,
+                inputs=[resume_output, candidate, title, resume_btn],
+                outputs=[ export_resume_to_docx, export_resume_to_pdf ],
+                concurrency_limit=None
+            )
+            export_cvl_btn.click(
+                export,
+                inputs=[cover_letter_op, candidate, title, cover_letter_btn],
+                outputs=[ export_cvl_to_docx, export_cvl_to_pdf ],
+                concurrency_limit=None
+            )
+            jd_input.change(
+                fn=prefetcher(services, llm),
+                inputs=[jd_input],
+                outputs=None,
+                show_progress="hidden",
+                concurrency_limit=None
+            )
+            score_btn.click(
+                fn=stream(services, 'prefetch', 'score_stream_async', llm),
+                inputs=[jd_input, use_cache],
+                outputs=[mdv_score],
+                concurrency_limit=None
+            )
+
+        with gr.Tab("Generate Response"):
             with gr.Row():
                 with gr.Column():
-                    resume_output = gr.Textbox(label="Generated Resume", lines=10)
+                    email_input = gr.Textbox(label="Recruiter's Message", lines=10)
+                    email_btn = gr.Button("Generate Response")
                 with gr.Column():
-                    resume_output_mdv = gr.Markdown(label="Generated Cover Letter",  buttons=["copy"])
-                    resume_output.change(fn=lambda x: x, inputs=resume_output, outputs=resume_output_mdv)
-        
-        with gr.Tab('Cover Letter'):
+                    email_output = gr.Textbox(label="Response", lines=10,  buttons=["copy"])
+                    apply_btn = gr.Button("Generate Email to Apply for JD")
+            email_btn.click(
+                stream(services, 'email', 'response_stream_async', llm),
+                inputs=[email_input, use_cache],
+                outputs=email_output,
+                concurrency_limit=None
+            )
+            apply_btn.click(
+                stream(services, 'email', 'apply_email_stream_async', llm),
+                inputs=[title, company, resume_output, jd_input, use_cache],
+                outputs=email_output,
+                concurrency_limit=None
+            )
+
+        with gr.Tab('Interview Prep'):
+            iv_qna_btn = gr.Button('Conduct Mock Interview')
+            iv_qna_txt = gr.Markdown(label='Mock Questions & Answers',  buttons=["copy"])
+
+            iv_qna_btn.click(
+                fn=stream(services, 'profile', 'interview_stream_async', llm),
+                inputs=[title, jd_input, resume_output, use_cache],
+                outputs=iv_qna_txt,
+                concurrency_limit=None
+            )
+
+        with gr.Tab('Linkedin Profile Boost'):
             with gr.Row():
                 with gr.Column():
-                    export_cvl_btn = gr.Button("Export To PDF & DOCX")
-                with gr.Column():
-                    export_cvl_to_docx = gr.File(label="Download CoverLetter.DOCX", elem_classes=["file-download"])
+                    about_me_btn = gr.Button('Generate About Me')
+                    about_me_txt = gr.Textbox(label='LinkedIn About Me', lines=10,  buttons=["copy"])
                 with gr.Column():
-                    export_cvl_to_pdf = gr.File(label="Download CoverLetter.PDF", elem_classes=["file-download"])
+                    conn_req_btn = gr.Button('Connection Request')
+                    conn_req_txt = gr.Textbox(label='Note', lines=10,  buttons=["copy"])
 
+                about_me_btn.click(
+                    fn=stream(services, 'profile', 'linkedin_about_me_stream_async', llm),
+                    inputs=[resume_output, use_cache],
+                    outputs=about_me_txt,
+                    concurrency_limit=None
+                )
+                conn_req_btn.click(
+                    fn=stream(services, 'profile', 'linkedin_connection_stream_async', llm),
+                    inputs=[jd_input, resume_output, use_cache],
+                    outputs=conn_req_txt,
+                    concurrency_limit=None
+                )
+
+        with gr.Tab('JD Triage'):
             with gr.Row():
                 with gr.Column():
-                    cover_letter_op = gr.Textbox(label="Generated Cover Letter", lines=10)
+                    triage_input = gr.Textbox(label="Job Descriptions (separate with a line containing ---)", lines=15)
+                    triage_btn = gr.Button('Rank Against Base Resume')
                 with gr.Column():
-                    cover_letter_op_mdv = gr.Markdown(label="Generated Cover Letter",  buttons=["copy"])
-                    cover_letter_op.change(fn=lambda x: x, inputs=cover_letter_op, outputs=cover_letter_op_mdv)
+                    triage_output = gr.Markdown(label='Ranking')
 
-        with gr.Tab("Base Resume Score"):
-            with gr.Row():
-                score_btn = gr.Button("Get Score")
-            with gr.Row():
-                mdv_score = gr.Markdown(label="Generated Score",  buttons=["copy"])
-                
-        with gr.Tab('ATS Check'):
-            ats_chec_op_mdv = gr.Markdown(label="ATS Check",  buttons=["copy"])
-
-        ats_chec_btn.click(
-            fn=ats.check,
-            inputs=[jd_input, company, title, resume_output],
-            outputs=ats_chec_op_mdv
-        )    
-
-        resume_btn.click(
-            fn=resume.generate, 
-            inputs=[jd_input, company, title, context], 
-            outputs=resume_output
-        )
-        cover_letter_btn.click(
-            cv.generate,
-            inputs=[jd_input, company, title, context],
-            outputs=cover_letter_op
-        )
-        export_resume_btn.click(
-            markdown_to_docx_and_pdf,
-            inputs=[resume_output, candidate, title, resume_btn],
-            outputs=[ export_resume_to_docx, export_resume_to_pdf ]
-        )
-        export_cvl_btn.click(
-            markdown_to_docx_and_pdf,
-            inputs=[cover_letter_op, candidate, title, cover_letter_btn],
-            outputs=[ export_cvl_to_docx, export_cvl_to_pdf ]
-        )
-        score_btn.click(
-            fn=score.check,
-            inputs=[jd_input],
-            outputs=[mdv_score]
-        )
-    
-    with gr.Tab("Generate Response"):
-        with gr.Row():
-            with gr.Column():
-                email_input = gr.Textbox(label="Recruiter's Message", lines=10)
-                email_btn = gr.Button("Generate Response")
-            with gr.Column():
-                email_output = gr.Textbox(label="Response", lines=10,  buttons=["copy"])
-                apply_btn = gr.Button("Generate Email to Apply for JD")
-        email_btn.click(
-            email.response,
-            inputs=email_input,
-            outputs=email_output
-        )
-        apply_btn.click(
-            email.apply_email,
-            inputs=[title, company, resume_output, jd_input],
-            outputs=email_output
-        )
-    
-    with gr.Tab('Interview Prep'):
-        iv_qna_btn = gr.Button('Conduct Mock Interview')
-        iv_qna_txt = gr.Markdown(label='Mock Questions & Answers',  buttons=["copy"])
-
-        iv_qna_btn.click(
-            fn=profile.interview,
-            inputs=[title, jd_input, resume_output],
-            outputs=iv_qna_txt
-        )
-
-    with gr.Tab('Linkedin Profile Boost'):
-        with gr.Row():
-            with gr.Column():
-                about_me_btn = gr.Button('Generate About Me')
-                about_me_txt = gr.Textbox(label='LinkedIn About Me', lines=10,  buttons=["copy"])
-            with gr.Column():
-                conn_req_btn = gr.Button('Connection Request')
-                conn_req_txt = gr.Textbox(label='Note', lines=10,  buttons=["copy"])
-            
-            about_me_btn.click(
-                fn=profile.linkedin_about_me,
-                inputs=[resume_output],
-                outputs=about_me_txt
+            triage_btn.click(
+                fn=ranker(services, gates['cheap']),
+                inputs=[triage_input],
+                outputs=triage_output,
+                concurrency_limit=None
             )
-            conn_req_btn.click(
-                fn=profile.linkedin_connection,
-                inputs=[jd_input, resume_output],
-                outputs=conn_req_txt
+
+        with gr.Tab('Full Application Pack'):
+            pack_btn = gr.Button('Generate Full Application Pack')
+            pack_status = gr.Markdown(label='Pipeline Progress')
+
+            pack_btn.click(
+                fn=stream(services, 'pack', 'run', llm, format_pack, fan_out=True),
+                inputs=[jd_input, company, title, context, use_cache],
+                outputs=[pack_status, resume_output, cover_letter_op, mdv_score, ats_chec_op_mdv,
+                         email_output, iv_qna_txt, about_me_txt, conn_req_txt],
+                concurrency_limit=None
+            ).then(
+                # The pack may have replaced the resume, so the next update starts from scratch
+                fn=lambda: None,
+                outputs=resume_draft
             )
 
- 
-demo.launch(
-    css=".file-download {height: 4em !important;}",
-    theme=gr.themes.Default(font=[gr.themes.GoogleFont("Cascadia Mono"), "Arial", "sans-serif"])
-)
\ No newline at end of file
+    return demo
+
+def main():
+    config = Config()
+    services = Services(config)
+
+    # Prometheus-style /metrics and raw /metrics.jsonl for per-prompt latency and token usage
+    metrics_config = config.get('llm').get('metrics', {})
+    if metrics_config.get('port'):
+        serve_metrics(services.metrics, metrics_config['port'], metrics_config.get('host', '127.0.0.1'))
+
+    # Keep the export store within its disk budget from a background thread
+    set_export_config(config.get('export')).start_sweeper()
+
+    # A template with unknown placeholders stops startup here rather than failing requests
+    services.validate()
+    demo = build_ui(services, config)
+    # Load the local models while the server starts
+    threading.Thread(target=services.warm, daemon=True).start()
+
+    # Handlers are async and share one event loop; Gradio runs them without a limit of its own,
+    # the admission gates of `ui.groups` bound each kind of work, and `ui.queueSize` bounds
+    # everything waiting in Gradio's queue
+    demo.queue(default_concurrency_limit=None, max_size=config.get('ui.queueSize'))
+    demo.launch(
+        css=".file-download {height: 4em !important;}",
+        theme=gr.themes.Default(font=[gr.themes.GoogleFont("Cascadia Mono"), "Arial", "sans-serif"])
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Headless batch runner: generate application artifacts for many job descriptions.
+
+Input is either a JSONL file or a directory of JSON files, each record holding
+`company`, `title` and `jd` (and optionally `id`). Progress is checkpointed to
+`<output>/checkpoint.jsonl`, so re-running the same command resumes where an
+interrupted run stopped.
+
+Usage (from the career-genie directory):
+
+    python src/batch.py --input jds.jsonl --output data/batch --name "Alex Morgan"
+    python src/batch.py --input saved-jds/ --output data/batch --name "Alex Morgan" \\
+        --artifacts resume score --concurrency 8
+    python src/batch.py --input jds.jsonl --name "Alex Morgan" --top 20 --artifacts score
+
+With `--top N` every record is first scored locally against the base resume and
+only the N best matches get LLM calls; the full ranking goes to `<output>/triage.jsonl`.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+from services.config import Config
+from services.factory import Services
+from services.pipeline import Pipeline, Step
+from services.utils import markdown_to_docx_and_pdf, read, set_export_config
+
+ARTIFACTS = ["resume", "coverLetter", "score", "ats"]
+EXPORTED = {"resume": "Generate Resume", "coverLetter": "Generate Cover Letter"}
+
+
+def triage(records, local_score, top, output):
+    """Keep the `top` records that best match the base resume, by local keyword score."""
+    ranking = local_score.rank([record["jd"] for record in records])
+    with (Path(output) / "triage.jsonl").open("w", encoding="utf-8") as f:
+        for result in ranking:
+            record = records[result["index"]]
+            f.write(json.dumps({"id": record["id"], "company": record["company"], "title": record["title"],
+                                "score": result["score"], "matched": result["matched"],
+                                "missing": result["missing"]}) + "\n")
+    return [records[result["index"]] for result in ranking[:top]]
+
+
+def load_records(source):
+    path = Path(source)
+    if path.is_dir():
+        files = sorted(path.glob("*.json"))
+        records = [json.loads(f.read_text(encoding="utf-8")) for f in files]
+    else:
+        lines = path.read_text(encoding="utf-8").splitlines()
+        records = [json.loads(line) for line in lines if line.strip()]
+
+    for record in records:
+        missing = [key for key in ("company", "title", "jd") if not record.get(key)]
+        if missing:
+            raise ValueError(f"Record is missing {missing}: {str(record)[:80]}")
+        if not record.get("id"):
+            digest = hashlib.sha256(f"{record['company']}|{record['title']}|{record['jd']}".encode("utf-8")).hexdigest()
+            record["id"] = digest[:12]
+    return records
+
+
+def keep(source, target):
+    """Hard-link `source` to `target` (copying it where links are not supported) and return the target path."""
+    partial = target.with_name(f".{target.name}.tmp")
+    partial.unlink(missing_ok=True)
+    try:
+        os.link(source, partial)
+    except OSError:
+        shutil.copyfile(source, partial)
+    os.replace(partial, target)
+    return str(target)
+
+
+class Checkpoint:
+    """Append-only log of completed (record, artifact) pairs."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done = {}
+        if self.path.exists():
+            lines = self.path.read_text(encoding="utf-8").splitlines()
+            for number, line in enumerate(lines, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    if number < len(lines):
+                        raise
+                    # A killed run can leave half a line; its artifact is redone, and the
+                    # line is dropped so the next entry is not appended onto it
+                    print(f"Ignoring truncated last line of {self.path}")
+                    self.path.write_text("".join(l + "\n" for l in lines[:-1]), encoding="utf-8")
+                    break
+                self.done[(entry["id"], entry["artifact"])] = entry
+        self._lock = asyncio.Lock()
+
+    def get(self, record_id, artifact):
+        return self.done.get((record_id, artifact))
+
+    async def add(self, entry):
+        async with self._lock:
+            self.done[(entry["id"], entry["artifact"])] = entry
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+class BatchRunner:
+    def __init__(self, services, output, name, artifacts, context="", export=True):
+        self.services = services
+        self.output = Path(output)
+        self.name = name
+        self.artifacts = artifacts
+        self.context = context
+        self.export = export
+        self.output.mkdir(parents=True, exist_ok=True)
+        self.checkpoint = Checkpoint(self.output / "checkpoint.jsonl")
+        self.failed = 0
+
+    async def run(self, records, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+        start = time.perf_counter()
+
+        async def process(index, record):
+            async with semaphore:
+                await self.process(record)
+                print(f"[{index + 1}/{len(records)}] {record['id']} {record['company']} - {record['title']}")
+
+        await asyncio.gather(*(process(i, r) for i, r in enumerate(records)))
+        print(f"Processed {len(records)} records in {time.perf_counter() - start:.1f}s ({self.failed} failed steps)")
+
+    async def process(self, record):
+        record_dir = self.output / record["id"]
+        record_dir.mkdir(parents=True, exist_ok=True)
+
+        steps = []
+        for artifact in self.artifacts:
+            depends = ["resume"] if artifact == "ats" else []
+            steps.append(Step(artifact, self._step(record, record_dir, artifact), depends))
+        if "ats" in self.artifacts and "resume" not in self.artifacts:
+            steps.append(Step("resume", self._step(record, record_dir, "resume")))
+
+        async for results in Pipeline(steps).run():
+            pass
+        for state in results.values():
+            if state.status in ("failed", "skipped"):
+                self.failed += 1
+                print(f"  {record['id']} {state.name} {state.status}: {state.error}")
+
+    def _step(self, record, record_dir, artifact):
+        async def run(outputs):
+            md_path = record_dir / f"{artifact}.md"
+            entry = self.checkpoint.get(record["id"], artifact)
+            if entry and md_path.exists():
+                text = md_path.read_text(encoding="utf-8")
+                if self.exported(entry, artifact):
+                    return text
+                # Done before, but its DOCX/PDF are gone: export them again from the saved Markdown
+            else:
+                text = await self.generate(record, artifact, outputs)
+                md_path.write_text(text, encoding="utf-8")
+            entry = {"id": record["id"], "artifact": artifact, "markdown": str(md_path)}
+            if self.export and artifact in EXPORTED:
+                entry["docx"], entry["pdf"] = await self.export_files(record, record_dir, artifact, text)
+            await self.checkpoint.add(entry)
+            return text
+        return run
+
+    def exported(self, entry, artifact):
+        """Whether the DOCX/PDF a checkpoint entry needs (if any) are on disk."""
+        if not (self.export and artifact in EXPORTED):
+            return True
+        return all(entry.get(kind) and Path(entry[kind]).exists() for kind in ("docx", "pdf"))
+
+    async def export_files(self, record, record_dir, artifact, text):
+        """Export `text` to DOCX and PDF, kept in `record_dir` where the export store's sweeper cannot evict them."""
+        paths = await markdown_to_docx_and_pdf(
+            text, self.name, f"{record['company']}-{record['title']}", EXPORTED[artifact], record["id"])
+        return [keep(path, record_dir / Path(path).name) for path in paths]
+
+    async def generate(self, record, artifact, outputs):
+        jd, company, title = record["jd"], record["company"], record["title"]
+        if artifact == "resume":
+            return await self.services.resume.generate_async(jd, company, title, self.context)
+        if artifact == "coverLetter":
+            return await self.services.cover_letter.generate_async(jd, company, title, self.context)
+        if artifact == "score":
+            return await self.services.score.check_async(jd)
+        if artifact == "ats":
+            return await self.services.ats.check_async(jd, company, title, outputs["resume"])
+        raise ValueError(f"Unknown artifact '{artifact}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", required=True, help="JSONL file or directory of JSON records")
+    parser.add_argument("--output", default="data/batch", help="Directory for outputs and the checkpoint")
+    parser.add_argument("--name", required=True, help="Candidate name used for exported file names")
+    parser.add_argument("--artifacts", nargs="+", default=ARTIFACTS, choices=ARTIFACTS)
+    parser.add_argument("--context", default="", help="Extra context for resume/cover letter, or file://path")
+    parser.add_argument("--concurrency", type=int, default=4, help="Job descriptions processed at once")
+    parser.add_argument("--no-export", action="store_true", help="Skip DOCX/PDF export")
+    parser.add_argument("--top", type=int, help="Only process the N records ranked best by the local scorer")
+    args = parser.parse_args()
+
+    config = Config()
+    services = Services(config)
+    output = Path(args.output)
+    if not args.no_export:
+        export_dir = output / "exports"
+        export_dir.mkdir(parents=True, exist_ok=True)
+        set_export_config({**config.get('export'), 'path': str(export_dir)})
+
+    context = read(args.context)
+    records = load_records(args.input)
+    if args.top:
+        output.mkdir(parents=True, exist_ok=True)
+        records = triage(records, services.local_score, args.top, output)
+    runner = BatchRunner(services, output, args.name, args.artifacts, context, export=not args.no_export)
+    asyncio.run(runner.run(records, args.concurrency))
+
+    services.metrics.export_jsonl(output / "metrics.jsonl")
+    for s in services.metrics.summary():
+        latency = s["latency"]
+        if latency:
+            print(f"{s['key']:<30} calls={s['calls']:<5} p50={latency['p50']:.2f}s p95={latency['p95']:.2f}s "
+                  f"tokens={s['promptTokens']}+{s['completionTokens']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import asyncio
+import contextlib
+from collections import deque
+
+
+class Busy(Exception):
+    """Raised when a concurrency group's queue is full."""
+
+
+class AdmissionGate:
+    """
+    Concurrency limit with a bounded FIFO queue for one group of handlers.
+
+    Up to `limit` requests run at once and up to `max_queue` more wait in order;
+    anything beyond that is rejected immediately with `Busy`, so a burst on one
+    group (e.g. PDF exports) cannot queue up behind or starve another (LLM calls).
+    Gates are used from a single event loop, like the UI's async handlers.
+    """
+
+    def __init__(self, name, limit, max_queue):
+        self.name = name
+        self.limit = int(limit)
+        self.max_queue = int(max_queue)
+        self.running = 0
+        self._waiters = deque()
+
+    @contextlib.asynccontextmanager
+    async def admit(self, on_queued=None, wait=True):
+        """
+        Hold a slot for the body of the `async with` block.
+
+        Args:
+            on_queued: Called with the 1-based queue position when the request has to wait
+            wait: Whether to queue for a slot; when False, `Busy` is raised unless one is free now
+        """
+        if self.running < self.limit and not self._waiters:
+            self.running += 1
+        else:
+            if not wait or len(self._waiters) >= self.max_queue:
+                raise Busy(
+                    f"Too many {self.name} requests right now ({self.running} running, "
+                    f"{len(self._waiters)} waiting). Please try again shortly.")
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            if on_queued is not None:
+                on_queued(len(self._waiters))
+            try:
+                # The releasing request hands its slot over by resolving the future
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    def stats(self):
+        return {"running": self.running, "waiting": len(self._waiters), "limit": self.limit, "maxQueue": self.max_queue}
+
+
+def create_gates(config):
+    """One gate per group under `ui.groups`, e.g. {"llm": {"limit": 24, "maxQueue": 48}, ...}."""
+    return {
+        name: AdmissionGate(name, group.get('limit', 1), group.get('maxQueue', 0))
+        for name, group in (config or {}).items()
+    }
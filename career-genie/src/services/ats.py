@@ -1,14 +1,144 @@
-import pdfkit
-from .utils import read
+import asyncio
+import contextlib
+import time
+
+from .ensemble import EnsembleResult, parse_report
+from .prompt_budget import PromptBudget
+from .templates import registry
 
 class AtsCheck:
-    def __init__(self, config, llm_interface):
+    def __init__(self, config, llm_interface, jd_analysis):
         self.config=config
         self.llm=llm_interface
+        self.jd_analysis=jd_analysis
+        self.budget=PromptBudget(self.config.get('budget'))
+        self.template=registry.formatter(*self.templates(config)['template'])
+
+    @staticmethod
+    def templates(config):
+        """{attribute: (source, placeholders)} of the templates the service binds; `Services.validate` checks them without building it."""
+        return {'template': (config['prompt'], {'title', 'company', 'job_description', 'resume', 'jd_analysis'})}
+
+    def check(self, jd, company, title, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.get_prompt(jd, company, title, resume, use_cache)
+        return self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='ats')
+
+    def check_stream(self, jd, company, title, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.get_prompt(jd, company, title, resume, use_cache)
+        yield from self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='ats', stream=True)
 
-    def check(self, jd, company, title, resume):
-        template=read(self.config['prompt'])
+    async def check_async(self, jd, company, title, resume, use_cache=True):
         model=self.config['model']
-        prompt = template.format(title=title, company=company, job_description=jd, resume=resume)
-        return self.llm.generate(prompt, model)
+        prompt = await self.get_prompt_async(jd, company, title, resume, use_cache)
+        return await self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='ats')
+
+    async def check_stream_async(self, jd, company, title, resume, use_cache=True):
+        model=self.config['model']
+        prompt = await self.get_prompt_async(jd, company, title, resume, use_cache)
+        async for partial in self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='ats', stream=True):
+            yield partial
+
+    def ensemble(self, jd, company, title, resume, use_cache=True):
+        """
+        Run the ATS prompt on every model of `ensemble.models` at once and aggregate the parsed scores.
+
+        Returns once `ensemble.quorum` models (default: all) have answered or after
+        `ensemble.deadline` seconds, with whatever has arrived by then.
+
+        Returns:
+            EnsembleResult: Per-model reports plus the median and spread of the scores and ratings
+        """
+        result = None
+        for result in self.ensemble_stream(jd, company, title, resume, use_cache):
+            pass
+        return result
+
+    def ensemble_stream(self, jd, company, title, resume, use_cache=True):
+        """Sync `ensemble_stream_async`, driven on the LLM interface's event loop so late models are cancelled too."""
+        yield from self.llm.iterate(self.ensemble_stream_async(jd, company, title, resume, use_cache))
+
+    async def ensemble_async(self, jd, company, title, resume, use_cache=True, admit=None):
+        result = None
+        async for result in self.ensemble_stream_async(jd, company, title, resume, use_cache, admit):
+            pass
+        return result
+
+    async def ensemble_stream_async(self, jd, company, title, resume, use_cache=True, admit=None):
+        """
+        Yield the `ensemble` result after every model that answers, then the finished result.
+
+        Args:
+            admit: Optional async context manager factory held around each LLM call (the JD
+                analysis and every model's report), e.g. a slot of the UI's LLM admission gate
+        """
+        admit = admit or contextlib.nullcontext
+        models, deadline, quorum = self.ensemble_settings()
+        async with admit():
+            prompt = await self.get_prompt_async(jd, company, title, resume, use_cache)
+        result = EnsembleResult(models)
+        start = time.perf_counter()
+
+        async def ask(model):
+            async with admit():
+                text = await self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='ats.ensemble')
+            return parse_report(model, text, time.perf_counter() - start)
+
+        tasks = {asyncio.ensure_future(ask(model)): model for model in models}
+        yield result
+        try:
+            pending = set(tasks)
+            while pending and len(result.reports) < quorum:
+                remaining = deadline - (time.perf_counter() - start)
+                if remaining <= 0:
+                    break
+                finished, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    self.collect(result, tasks[task], task.exception() or task.result())
+                if finished:
+                    yield result
+        finally:
+            # Models still running past the deadline or the quorum are cancelled
+            for task in tasks:
+                task.cancel()
+        yield self.finish(result)
+
+    def ensemble_settings(self):
+        ensemble = self.config.get('ensemble') or {}
+        models = list(ensemble.get('models') or [self.config['model']])
+        quorum = min(int(ensemble.get('quorum') or len(models)), len(models))
+        return models, float(ensemble.get('deadline', 60)), quorum
+
+    @staticmethod
+    def collect(result, model, outcome):
+        if isinstance(outcome, BaseException):
+            print(f"ATS ensemble: {model} failed: {outcome}")
+            result.errors[model] = f"failed ({type(outcome).__name__})"
+        else:
+            result.reports[model] = outcome
+
+    @staticmethod
+    def finish(result):
+        result.done = True
+        if not result.reports:
+            failed = ", ".join(f"{model}: {error}" for model, error in result.errors.items())
+            raise RuntimeError(f"No ATS ensemble model answered in time{'; ' + failed if failed else ''}")
+        return result
+
+    def get_prompt(self, jd, company, title, resume, use_cache=True):
+        analysis=self.jd_analysis.analyze(jd, use_cache)
+        return self.format_prompt(jd, company, title, resume, analysis)
+
+    async def get_prompt_async(self, jd, company, title, resume, use_cache=True):
+        analysis=await self.jd_analysis.analyze_async(jd, use_cache)
+        return self.format_prompt(jd, company, title, resume, analysis)
+
+    def format_prompt(self, jd, company, title, resume, analysis):
+        return self.template(
+            title=title,
+            company=company,
+            job_description=self.budget.fit('job_description', jd),
+            resume=self.budget.fit('resume', resume, jd),
+            jd_analysis=analysis)
     
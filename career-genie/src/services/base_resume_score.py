@@ -1,18 +1,55 @@
-from .utils import read
+from .prompt_budget import PromptBudget, prefix_query
+from .templates import registry
 class BaseScore:
-    def __init__(self, config, llm_interface):
+    def __init__(self, config, llm_interface, jd_analysis):
         self.config=config
         self.llm=llm_interface
-        fields = self.get_fields()
-        self.base_resume = read(fields['baseResume'])
+        self.jd_analysis=jd_analysis
+        self.budget=PromptBudget(self.config.get('budget'))
+        self.template=registry.formatter(*self.templates(config)['template'])
 
-    def check(self, job_description):
+    @staticmethod
+    def templates(config):
+        """{attribute: (source, placeholders)} of the templates the service binds; `Services.validate` checks them without building it."""
+        return {'template': (config['prompt'], {'job_description', 'base_resume', 'jd_analysis'})}
+
+    def check(self, job_description, use_cache=True):
+        model=self.config['model']
+        prompt = self.get_prompt(job_description, use_cache)
+        return self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='score')
+
+    def check_stream(self, job_description, use_cache=True):
         model=self.config['model']
-        template=read(self.config['prompt'])
-        prompt = template.format(
-            job_description=job_description, 
-            base_resume=self.base_resume)
-        return self.llm.generate(prompt, model)
+        prompt = self.get_prompt(job_description, use_cache)
+        yield from self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='score', stream=True)
+
+    async def check_async(self, job_description, use_cache=True):
+        model=self.config['model']
+        prompt = await self.get_prompt_async(job_description, use_cache)
+        return await self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='score')
+
+    async def check_stream_async(self, job_description, use_cache=True):
+        model=self.config['model']
+        prompt = await self.get_prompt_async(job_description, use_cache)
+        async for partial in self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='score', stream=True):
+            yield partial
+
+    def get_prompt(self, job_description, use_cache=True):
+        analysis=self.jd_analysis.analyze(job_description, use_cache)
+        return self.format_prompt(job_description, analysis)
+
+    async def get_prompt_async(self, job_description, use_cache=True):
+        analysis=await self.jd_analysis.analyze_async(job_description, use_cache)
+        return self.format_prompt(job_description, analysis)
+
+    def format_prompt(self, job_description, analysis):
+        return self.template(
+            job_description=self.budget.fit('job_description', job_description),
+            base_resume=self.budget.fit('base_resume', self.get_resume(), prefix_query(self.llm, job_description)),
+            jd_analysis=analysis)
 
     def get_fields(self):
-        return self.config['input']
\ No newline at end of file
+        return self.config['input']
+
+    def get_resume(self):
+        return registry.get(self.get_fields()['baseResume'])
\ No newline at end of file
@@ -1,22 +1,73 @@
+from .prompt_budget import PromptBudget
+from .templates import registry
+
 class EmailResponse:
     def __init__(self, config, llm_interface):
         self.config=config
         self.llm=llm_interface
+        self.budget=PromptBudget(self.config.get('budget'))
+        templates=self.templates(config)
+        self.message_template=registry.formatter(*templates['message_template'])
+        self.email_template=registry.formatter(*templates['email_template'])
+
+    @staticmethod
+    def templates(config):
+        """{attribute: (source, placeholders)} of the templates the service binds; `Services.validate` checks them without building it."""
+        return {
+            'message_template': (config['prompt'].get('message'), {'message'}),
+            'email_template': (config['prompt'].get('email'), {'job_title', 'company', 'job_description', 'resume'}),
+        }
+
+    def response(self, message, use_cache=True):
+        model=self.config['model']
+        prompt = self.response_prompt(message)
+        return self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='responses.message')
+
+    def response_stream(self, message, use_cache=True):
+        model=self.config['model']
+        prompt = self.response_prompt(message)
+        yield from self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='responses.message', stream=True)
+
+    async def response_async(self, message, use_cache=True):
+        model=self.config['model']
+        prompt = self.response_prompt(message)
+        return await self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='responses.message')
 
-    def response(self, message):
-        template=self.config['prompt'].get('message')
+    async def response_stream_async(self, message, use_cache=True):
         model=self.config['model']
-        prompt = template.format(message=message)
-        return self.llm.generate(prompt, model)
+        prompt = self.response_prompt(message)
+        async for partial in self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='responses.message', stream=True):
+            yield partial
 
-    def apply_email(self, title, company, resume, jd):
-        template=self.config['prompt'].get('email')
+    def apply_email(self, title, company, resume, jd, use_cache=True):
         model=self.config['model']
-        prompt = template.format(
+        prompt = self.apply_email_prompt(title, company, resume, jd)
+        return self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='responses.email')
+
+    def apply_email_stream(self, title, company, resume, jd, use_cache=True):
+        model=self.config['model']
+        prompt = self.apply_email_prompt(title, company, resume, jd)
+        yield from self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='responses.email', stream=True)
+
+    async def apply_email_async(self, title, company, resume, jd, use_cache=True):
+        model=self.config['model']
+        prompt = self.apply_email_prompt(title, company, resume, jd)
+        return await self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='responses.email')
+
+    async def apply_email_stream_async(self, title, company, resume, jd, use_cache=True):
+        model=self.config['model']
+        prompt = self.apply_email_prompt(title, company, resume, jd)
+        async for partial in self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='responses.email', stream=True):
+            yield partial
+
+    def response_prompt(self, message):
+        return self.message_template(message=message)
+
+    def apply_email_prompt(self, title, company, resume, jd):
+        return self.email_template(
             job_title=title,
             company=company,
-            job_description=jd,
-            resume=resume)
-        return self.llm.generate(prompt, model)
+            job_description=self.budget.fit('job_description', jd),
+            resume=self.budget.fit('resume', resume, jd))
 
 
@@ -0,0 +1,162 @@
+import re
+import statistics
+from dataclasses import dataclass, field
+
+# Evaluation parameters of data/prompts/ats.md, in report order
+PARAMETERS = [
+    "Skills", "Education", "Functional Area", "Key Skills Required",
+    "Skill Mismatch", "Work Experience", "Industry Match",
+]
+
+NUMBER = re.compile(r"(\d{1,3}(?:\.\d+)?)")
+LIST_ITEM = re.compile(r"^\s*(?:#+\s*)?\d+[.)]\s+")
+PERCENT = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*%")
+
+
+@dataclass
+class Report:
+    """One model's ATS report and the numbers parsed from it."""
+    model: str
+    text: str
+    elapsed: float
+    score: float | None = None
+    ratings: dict = field(default_factory=dict)
+
+
+@dataclass
+class EnsembleResult:
+    """Reports collected so far from the ensemble's models, with their aggregate."""
+    models: list
+    reports: dict = field(default_factory=dict)
+    errors: dict = field(default_factory=dict)
+    done: bool = False
+
+    @property
+    def pending(self):
+        return [m for m in self.models if m not in self.reports and m not in self.errors]
+
+    @property
+    def scores(self):
+        return [r.score for r in self.reports.values() if r.score is not None]
+
+    @property
+    def score(self):
+        return stats(self.scores)
+
+    @property
+    def ratings(self):
+        return {
+            name: stats([r.ratings[name] for r in self.reports.values() if name in r.ratings])
+            for name in PARAMETERS
+        }
+
+    def representative(self):
+        """The report whose score is closest to the median, for its recommendations."""
+        scored = [r for r in self.reports.values() if r.score is not None]
+        if not scored:
+            return next(iter(self.reports.values()), None)
+        median = self.score["median"]
+        return min(scored, key=lambda r: (abs(r.score - median), r.elapsed))
+
+
+def stats(values):
+    if not values:
+        return {"median": None, "spread": None, "min": None, "max": None, "count": 0}
+    return {
+        "median": statistics.median(values),
+        "spread": max(values) - min(values),
+        "min": min(values),
+        "max": max(values),
+        "count": len(values),
+    }
+
+
+def clean_cell(text):
+    return re.sub(r"[*_`]", "", text).strip()
+
+
+def parameter(name):
+    """Canonical parameter for a table cell such as '4. **Key Skills Required**', or None."""
+    name = re.sub(r"^\d+[.)]\s*", "", clean_cell(name)).casefold()
+    matches = [p for p in PARAMETERS if p.casefold() in name]
+    # "Key Skills Required" also contains "Skills": prefer the most specific name
+    return max(matches, key=len) if matches else None
+
+
+def overall_score(lines):
+    """The overall match score, from the line naming it or the next non-empty line."""
+    for i, line in enumerate(lines):
+        lowered = line.casefold()
+        if "overall" not in lowered or "score" not in lowered:
+            continue
+        following = [l for l in lines[i + 1:i + 4] if l.strip()][:1]
+        for candidate in [LIST_ITEM.sub("", line).replace("(%)", "")] + following:
+            match = PERCENT.search(candidate) or NUMBER.search(candidate)
+            if match and float(match.group(1)) <= 100:
+                return float(match.group(1))
+        return None
+    return None
+
+
+def parse_report(model, text, elapsed=0.0):
+    """Parse the overall match score and the per-parameter ratings (1-10) of an ATS report."""
+    report = Report(model, text, elapsed)
+    lines = text.splitlines()
+    report.score = overall_score(lines)
+
+    columns = None
+    for line in lines:
+        if not line.strip().startswith("|"):
+            columns = None
+            continue
+        cells = [clean_cell(c) for c in line.strip().strip("|").split("|")]
+        lowered = [c.casefold() for c in cells]
+        if columns is None:
+            if any("parameter" in c for c in lowered) and any("rating" in c for c in lowered):
+                columns = (next(i for i, c in enumerate(lowered) if "parameter" in c),
+                           next(i for i, c in enumerate(lowered) if "rating" in c))
+            continue
+        name_at, rating_at = columns
+        if rating_at >= len(cells) or set(cells[rating_at]) <= set("-: "):
+            continue
+        name = parameter(cells[name_at])
+        rating = NUMBER.search(cells[rating_at])
+        if name and rating and float(rating.group(1)) <= 10:
+            report.ratings.setdefault(name, float(rating.group(1)))
+    return report
+
+
+def format_value(value, suffix=""):
+    return "-" if value is None else f"{value:g}{suffix}"
+
+
+def format_ensemble(result):
+    """Render an ensemble result as Markdown: aggregate score, per-parameter table and one full report."""
+    score = result.score
+    lines = []
+    if score["count"]:
+        lines.append(f"## Ensemble Job Match Score: {format_value(score['median'], '%')}")
+        lines.append(f"Median of {score['count']} model(s), spread {format_value(score['spread'])} points "
+                     f"({format_value(score['min'], '%')} to {format_value(score['max'], '%')}).")
+    else:
+        lines.append("## Ensemble Job Match Score: waiting for models..." if not result.done
+                     else "## Ensemble Job Match Score: no model returned a score")
+
+    lines += ["", "| Model | Score | Time (s) |", "|---|---|---|"]
+    for model in result.models:
+        if model in result.reports:
+            report = result.reports[model]
+            lines.append(f"| {model} | {format_value(report.score, '%')} | {report.elapsed:.1f} |")
+        elif model in result.errors:
+            lines.append(f"| {model} | {result.errors[model]} | - |")
+        else:
+            lines.append(f"| {model} | {'running' if not result.done else 'cancelled'} | - |")
+
+    lines += ["", "| Parameter | Median | Spread | Models |", "|---|---|---|---|"]
+    for name, values in result.ratings.items():
+        lines.append(f"| {name} | {format_value(values['median'])} | {format_value(values['spread'])} | {values['count']} |")
+
+    report = result.representative() if result.reports else None
+    if report is not None:
+        lines += ["", f"### Report from {report.model} (closest to the median)", "", report.text]
+    return "\n".join(lines)
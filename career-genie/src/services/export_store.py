@@ -0,0 +1,151 @@
+import os
+import re
+import shutil
+import threading
+import time
+from pathlib import Path
+
+
+class ExportStore:
+    """
+    Content-addressed export files with per-session download paths and a disk budget.
+
+    Rendered files live once under `blobs/<digest>.<ext>`; each session gets hard
+    links under `sessions/<session>/`, so identical exports from many users share
+    one copy on disk and one user's download never replaces another's. A sweeper
+    evicts the least recently used files (all links of a file together) until the
+    store fits in `maxBytes`, skipping anything used in the last `minAge` seconds.
+    """
+
+    def __init__(self, root, config=None):
+        config = config or {}
+        self.root = Path(root)
+        self.blobs = self.root / "blobs"
+        self.sessions = self.root / "sessions"
+        self.max_bytes = int(config.get('maxBytes', 512 * 1024 * 1024))
+        self.min_age = float(config.get('minAge', 600))
+        self.sweep_interval = float(config.get('sweepInterval', 300))
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.sessions.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Held while a session folder gets a link and while the sweeper deletes, so neither
+        # sees a folder or blob vanish halfway
+        self._links = threading.Lock()
+        self._added = 0
+        self._sweeper = None
+
+    def blob(self, digest, ext):
+        return self.blobs / f"{digest}{ext}"
+
+    def has(self, *paths):
+        """True when every blob exists; marks them as recently used."""
+        try:
+            for path in paths:
+                os.utime(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def publish(self, blob, session, filename):
+        """Expose `blob` as `sessions/<session>/<filename>` and return that path."""
+        folder = self.sessions / safe_name(session or "shared")
+        target = folder / filename
+        with self._links:
+            folder.mkdir(parents=True, exist_ok=True)
+            if target.exists() and os.path.samefile(blob, target):
+                return str(target)
+
+            partial = folder / f".{filename}.{threading.get_ident()}.tmp"
+            try:
+                os.link(blob, partial)
+            except OSError:
+                # No hard links on this filesystem: fall back to a copy
+                shutil.copyfile(blob, partial)
+                copied = partial.stat().st_size
+            else:
+                copied = 0
+            os.replace(partial, target)
+        if copied:
+            self.added(copied)
+        return str(target)
+
+    def added(self, size):
+        """Account for newly written bytes; sweeps early when a tenth of the budget has been added."""
+        with self._lock:
+            self._added += size
+            due = self._added > self.max_bytes / 10
+        if due:
+            threading.Thread(target=self.sweep, daemon=True).start()
+
+    def sweep(self):
+        """Evict least recently used files until the store fits the budget. Returns the bytes freed."""
+        with self._lock:
+            self._added = 0
+
+        files = {}
+        for path in self.root.rglob("*"):
+            try:
+                stat = path.lstat()
+            except FileNotFoundError:
+                continue
+            if not path.is_file():
+                continue
+            entry = files.setdefault((stat.st_dev, stat.st_ino), {"size": stat.st_size, "used": stat.st_mtime, "paths": []})
+            entry["paths"].append(path)
+
+        total = sum(entry["size"] for entry in files.values())
+        freed = 0
+        cutoff = time.time() - self.min_age
+        for entry in sorted(files.values(), key=lambda e: e["used"]):
+            if total - freed <= self.max_bytes:
+                break
+            if entry["used"] > cutoff:
+                break
+            with self._links:
+                try:
+                    # Re-check: an export may have reused the file since the scan
+                    if entry["paths"][0].stat().st_mtime > cutoff:
+                        continue
+                except FileNotFoundError:
+                    continue
+                for path in entry["paths"]:
+                    path.unlink(missing_ok=True)
+            freed += entry["size"]
+
+        with self._links:
+            for folder in self.sessions.iterdir():
+                if folder.is_dir() and folder.stat().st_mtime < cutoff and not any(folder.iterdir()):
+                    folder.rmdir()
+        if freed:
+            print(f"Export store: evicted {freed} bytes, {total - freed} bytes in use")
+        return freed
+
+    def start_sweeper(self):
+        """Run `sweep` every `sweepInterval` seconds in a daemon thread."""
+        if self._sweeper is not None:
+            return self._sweeper
+
+        def run():
+            while True:
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"Export store sweep failed: {e}")
+                time.sleep(self.sweep_interval)
+
+        self._sweeper = threading.Thread(target=run, daemon=True)
+        self._sweeper.start()
+        return self._sweeper
+
+    def usage(self):
+        """Bytes on disk, counting hard-linked files once."""
+        inodes = {}
+        for path in self.root.rglob("*"):
+            if path.is_file():
+                stat = path.stat()
+                inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+        return sum(inodes.values())
+
+
+def safe_name(value):
+    return re.sub(r"[^A-Za-z0-9._-]", "_", value)[:64] or "_"
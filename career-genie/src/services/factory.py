@@ -0,0 +1,115 @@
+import functools
+import threading
+
+from .email_response import EmailResponse
+from .resume import Resume
+from .ats import AtsCheck
+from .profile import Profile
+from .base_resume_score import BaseScore
+from .jd_analysis import JdAnalysis
+from .local_score import LocalScore
+from .metrics import Metrics
+from .prefetch import Prefetcher
+from .templates import registry
+from .pipeline import ApplicationPack
+
+
+# Config section of every service binding prompt templates, for `Services.validate`
+TEMPLATES = (
+    ('prompts.jdAnalysis', JdAnalysis),
+    ('prompts.responses', EmailResponse),
+    ('prompts.resume', Resume),
+    ('prompts.coverLetter', Resume),
+    ('prompts.ats', AtsCheck),
+    ('prompts.profile', Profile),
+    ('prompts.score', BaseScore),
+)
+
+
+def service(build):
+    """Create the service on first access and keep it; safe when worker threads race on first use."""
+    name = build.__name__
+
+    @functools.wraps(build)
+    def get(self):
+        if name not in self.__dict__:
+            with self._lock:
+                if name not in self.__dict__:
+                    self.__dict__[name] = build(self)
+        return self.__dict__[name]
+    return property(get)
+
+
+class Services:
+    """
+    Builds every service on one shared LLMInterface, for the UI and the batch runner alike.
+
+    Services are created on first use, so startup only loads the config and prompt
+    files; the OpenAI client is imported and connected by the first LLM request.
+    `validate` checks every prompt template without building any service, so a
+    bad template fails startup, and `warm` preloads the local models, e.g. from
+    a background thread.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.RLock()
+        # Load every file:// prompt and input once; templates are validated as services bind them
+        registry.load_config(config.get())
+        self.metrics = Metrics(config.get('llm').get('metrics', {}).get('maxRecords', 10000))
+
+    @service
+    def llm(self):
+        from .llm_interface import LLMInterface
+        return LLMInterface(self.config.get('llm'), self.metrics)
+
+    @service
+    def jd_analysis(self):
+        return JdAnalysis(self.config.get('prompts.jdAnalysis'), self.llm)
+
+    @service
+    def email(self):
+        return EmailResponse(self.config.get('prompts.responses'), self.llm)
+
+    @service
+    def resume(self):
+        return Resume(self.config.get('prompts.resume'), self.llm, self.jd_analysis)
+
+    @service
+    def cover_letter(self):
+        return Resume(self.config.get('prompts.coverLetter'), self.llm, self.jd_analysis, 'coverLetter')
+
+    @service
+    def ats(self):
+        return AtsCheck(self.config.get('prompts.ats'), self.llm, self.jd_analysis)
+
+    @service
+    def profile(self):
+        return Profile(self.config.get('prompts.profile'), self.llm)
+
+    @service
+    def score(self):
+        return BaseScore(self.config.get('prompts.score'), self.llm, self.jd_analysis)
+
+    @service
+    def prefetch(self):
+        return Prefetcher(self.config.get('prefetch'), self.score)
+
+    @service
+    def local_score(self):
+        return LocalScore(self.config.get('prompts.score'))
+
+    @service
+    def pack(self):
+        return ApplicationPack(
+            self.resume, self.cover_letter, self.ats, self.score, self.email, self.profile)
+
+    def validate(self):
+        """Check every prompt template against its service's placeholders; raises ValueError for a bad one."""
+        for key, service_class in TEMPLATES:
+            for source, fields in service_class.templates(self.config.get(key)).values():
+                registry.validate(source, fields)
+
+    def warm(self):
+        """Preload the local models and keep them resident."""
+        self.llm.warm()
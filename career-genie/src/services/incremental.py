@@ -0,0 +1,93 @@
+import hashlib
+import re
+
+from .prompt_budget import bm25, split_sections, terms
+
+SUMMARY = re.compile(r"summary|profile|objective|about", re.IGNORECASE)
+FENCE = re.compile(r"^\s*```[\w-]*\n|\n```\s*$")
+
+
+class Draft:
+    """
+    The inputs a resume was last generated from.
+
+    Kept per session (a `gr.State` in the UI) next to the generated Markdown, so
+    the next request can compare its inputs against these and regenerate only
+    the sections the change touches.
+    """
+
+    def __init__(self, jd, company, title, context, base_resume):
+        self.jd = jd or ""
+        self.company = company or ""
+        self.title = title or ""
+        self.context = context or ""
+        self.base = digest(base_resume)
+
+
+def digest(text):
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def heading(section):
+    return section.text.partition("\n")[0].lstrip("#").strip().casefold()
+
+
+def plan(resume, draft, jd, company, title, context, base_resume, max_share=0.6):
+    """
+    Decide which sections of `resume` a change of inputs affects.
+
+    Returns `(sections, targets)`: every section of the resume and the ones to
+    regenerate, or None when a full regeneration is needed (no previous draft,
+    a different role, company or base resume, or a change touching more than
+    `max_share` of the sections). A section is affected when it, or the base
+    resume section under the same heading, mentions a term that was added to or
+    removed from the JD and context. The summary follows any change.
+    """
+    if draft is None or not (resume or "").strip():
+        return None
+    if (company or "", title or "") != (draft.company, draft.title) or digest(base_resume) != draft.base:
+        return None
+
+    sections = split_sections(resume)
+    # The name and contact details (a leading `#` heading or preamble) are never rewritten
+    units = [s for s in sections if s.level > (1 if s.index == 0 else 0) and s.has_body]
+    if not units:
+        return None
+
+    changed = set(terms(f"{jd}\n{context}")) ^ set(terms(f"{draft.jd}\n{draft.context}"))
+    if not changed:
+        # Only whitespace or wording without content terms changed
+        return sections, []
+
+    base = {heading(s): s.text for s in split_sections(base_resume) if s.level}
+    scores = bm25([terms(f"{s.text}\n{base.get(heading(s), '')}") for s in units], list(changed))
+    targets = [s for s, score in zip(units, scores) if score > 0]
+
+    summary = next((s for s in units if SUMMARY.search(heading(s))), units[0])
+    if summary not in targets:
+        targets.insert(0, summary)
+    if len(targets) > max_share * len(units):
+        return None
+    return sections, targets
+
+
+def base_section(section, base_resume):
+    """The base resume section under the same heading, or the section itself when the heading is new."""
+    for candidate in split_sections(base_resume):
+        if candidate.level and heading(candidate) == heading(section):
+            return candidate.text
+    return section.text
+
+
+def clean(text, section):
+    """Strip code fences from a regenerated section and make sure it keeps its heading."""
+    text = FENCE.sub("", text).strip()
+    if not text.startswith("#"):
+        title = section.text.partition("\n")[0]
+        text = f"{title}\n{text}"
+    return text
+
+
+def merge(sections, replacements):
+    """Reassemble the resume, taking regenerated sections from `replacements` by index."""
+    return "\n\n".join(replacements.get(s.index, s.text) for s in sections)
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future
+
+from .templates import registry
+
+
+class Abandoned(Exception):
+    """The call a request was waiting on was cancelled by its owner; the waiter makes its own."""
+
+
+class JdAnalysis:
+    """
+    Extracts skills and keywords from a job description once per JD.
+
+    Results are memoized by a fingerprint of the normalized job description and
+    shared by every service that needs them (resume, cover letter, score, ATS).
+    Concurrent requests for the same JD, sync or async, wait on a single
+    in-flight LLM call instead of issuing their own. When that call is cancelled
+    (e.g. a speculative prefetch for a JD the user has since edited), the
+    waiters start over instead of failing.
+    """
+
+    def __init__(self, config, llm_interface):
+        self.config=config
+        self.llm=llm_interface
+        self.max_entries = int(config.get('maxEntries', 128))
+        self.template = registry.formatter(*self.templates(config)['template'])
+        self._results = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def templates(config):
+        """{attribute: (source, placeholders)} of the templates the service binds; `Services.validate` checks them without building it."""
+        return {'template': (config['prompt'], {'job_description'})}
+
+    @staticmethod
+    def fingerprint(job_description):
+        normalized = re.sub(r"\s+", " ", job_description or "").strip().casefold()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def analyze(self, job_description, use_cache=True):
+        key = self.fingerprint(job_description)
+        while True:
+            result, future, owner = self._claim(key, use_cache)
+            if result is not None:
+                return result
+            if owner:
+                break
+            try:
+                return future.result()
+            except Abandoned:
+                continue
+
+        try:
+            result = self.llm.generate(self.get_prompt(job_description), self.config['model'], use_cache=use_cache, prompt_key='jdAnalysis')
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._resolve(key, future, result)
+        return result
+
+    async def analyze_async(self, job_description, use_cache=True):
+        key = self.fingerprint(job_description)
+        while True:
+            result, future, owner = self._claim(key, use_cache)
+            if result is not None:
+                return result
+            if owner:
+                break
+            try:
+                # Shielded: cancelling this waiter must not cancel the owner's shared future
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except Abandoned:
+                continue
+
+        try:
+            result = await self.llm.generate_async(self.get_prompt(job_description), self.config['model'], use_cache=use_cache, prompt_key='jdAnalysis')
+        except BaseException as e:
+            self._fail(key, future, e)
+            raise
+        self._resolve(key, future, result)
+        return result
+
+    def get_prompt(self, job_description):
+        return self.template(job_description=job_description)
+
+    def _claim(self, key, use_cache):
+        """Return (memoized result, in-flight future, whether the caller must compute it)."""
+        with self._lock:
+            if use_cache and key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key], None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                return None, future, False
+            future = Future()
+            self._inflight[key] = future
+            return None, future, True
+
+    def _resolve(self, key, future, result):
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+        if not future.done():
+            future.set_result(result)
+
+    def _fail(self, key, future, error):
+        """Fail the waiters with `error`, or make them start over when the owner was cancelled or interrupted."""
+        if isinstance(error, (asyncio.CancelledError, CancelledError)) or not isinstance(error, Exception):
+            error = Abandoned()
+        with self._lock:
+            self._inflight.pop(key, None)
+        if not future.done():
+            future.set_exception(error)
@@ -1,42 +1,288 @@
-from openai import OpenAI
+import asyncio
+import threading
+import time
+
+import httpx
+
+from .cache import create_cache
+from .metrics import Metrics
+from .providers import FailoverPolicy, Provider
 
 class LLMInterface:
-    def __init__(self, config):
+    def __init__(self, config, metrics=None):
         use_config = config['use']
         self.use_local = True if use_config is None or use_config == "local" else False
-        self.api_config = config[use_config]
+        self.api_config = config[use_config or 'local']
         self.model = self.api_config.get('model')
-        
-        # Initialize OpenAI client with custom base URL if provided
-        if self.use_local:
-            # Local LLM server (e.g., Ollama)
-            self.client = OpenAI(
-                base_url=self.api_config.get('url', 'http://localhost:11434/v1'),
-                api_key='not-required'  # Local servers typically don't need an API key
-            )
-        else:
-            # Remote providers (Groq, OpenRouter, etc.)
-            self.client = OpenAI(
-                base_url=self.api_config.get('url'),
-                api_key=self.api_config['apiKey']
+
+        # Keep-alive connection pools shared by every request of this interface
+        limits, timeout = self.__http_settings(config.get('http', {}))
+
+        # The selected provider first, then the failover providers in configured order
+        failover = config.get('failover') or []
+        if isinstance(failover, str):
+            failover = [name.strip() for name in failover.split(',') if name.strip()]
+        self.providers = []
+        for name in [use_config or 'local'] + failover:
+            if name in [p.name for p in self.providers]:
+                continue
+            provider_config = config.get(name) or {}
+            if name != 'local' and not provider_config.get('apiKey'):
+                print(f"Skipping LLM provider '{name}': no apiKey configured")
+                continue
+            self.providers.append(Provider(name, provider_config, limits, timeout))
+        if not self.providers:
+            raise ValueError(
+                f"No LLM provider is usable: set llm.{use_config}.apiKey, "
+                f"or list 'local' in llm.failover"
             )
+        self.client = self.providers[0].client
+        self.async_client = self.providers[0].async_client
+        # Per-provider quotas, Retry-After handling, backoff and optional hedging
+        self.policy = FailoverPolicy(self.providers, config.get('retry', {}))
+
+        # Response cache shared by every service using this interface
+        self.cache = create_cache(config.get('cache'))
+        # Per-call latency and token usage, aggregated per prompt key
+        self.metrics = metrics or Metrics(config.get('metrics', {}).get('maxRecords', 10000))
+        # Background event loop for synchronous callers of async-only code paths, started on first use
+        self._loop = None
+        self._loop_lock = threading.Lock()
 
-    def generate(self, prompt, model=None):
+    def generate(self, prompt, model=None, use_cache=True, stream=False, prompt_key=None, **params):
         """
         Generate a response from the LLM.
-        
+
+        With `retry.hedgeAfter` set, the request goes through `generate_async` on the
+        interface's background loop (see `run`), where the slower hedged request
+        can be cancelled.
+
         Args:
             prompt: The input prompt to send to the LLM
             model: The model to use (optional, uses config default if not provided)
-            
+            use_cache: Serve identical requests from the response cache. When False the
+                cache is bypassed for the lookup but refreshed with the new response.
+            stream: Return a generator yielding the partial response text as tokens arrive
+            prompt_key: Name of the prompt (e.g. "ats", "profile.interview") used to group metrics
+            **params: Extra sampling parameters (temperature, top_p, ...) for the request
+
         Returns:
-            The generated response text
+            The generated response text, or a generator of partial texts when streaming
         """
         use_model = model or self.model
-        
-        response = self.client.chat.completions.create(
-            model=use_model,
-            messages=[{"role": "user", "content": prompt}]
+        if self.policy.hedging:
+            # Only the async path can cancel the slower of two hedged requests
+            call = self.generate_async(prompt, use_model, use_cache, stream, prompt_key, **params)
+            return self.iterate(call) if stream else self.run(call)
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(use_model, prompt, params)
+
+        if stream:
+            return self._stream(prompt, use_model, key, use_cache, prompt_key, params)
+
+        start = time.perf_counter()
+        if key is not None and use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.record(prompt_key, use_model, start, cached=True)
+                return cached
+
+        try:
+            provider, response, sent = self.policy.create(
+                use_model, [{"role": "user", "content": prompt}], **params)
+        except Exception as e:
+            self.metrics.record(prompt_key, use_model, start, error=e)
+            raise
+        content = response.choices[0].message.content
+        self.metrics.record(prompt_key, use_model, start, usage=response.usage, provider=provider.name, sent=sent)
+
+        if key is not None:
+            self.cache.set(key, use_model, content)
+        return content
+
+    def _stream(self, prompt, model, key, use_cache, prompt_key, params):
+        """Yield the accumulated response text after every streamed chunk."""
+        start = time.perf_counter()
+        if key is not None and use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.record(prompt_key, model, start, stream=True, cached=True)
+                yield cached
+                return
+
+        content, usage, ttft, provider, sent = "", None, None, None, None
+        error, cancelled = None, False
+        try:
+            # Failover only happens before the stream opens; a broken stream is not replayed
+            provider, response, sent = self.policy.create(
+                model, [{"role": "user", "content": prompt}],
+                stream=True, stream_options={"include_usage": True}, **params)
+            for chunk in response:
+                usage = chunk.usage or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if ttft is None:
+                        ttft = time.perf_counter() - sent
+                    content += delta
+                    yield content
+        except GeneratorExit:
+            # The consumer stopped reading
+            cancelled = True
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.metrics.record(prompt_key, model, start, usage=usage, ttft=ttft, stream=True, error=error,
+                                cancelled=cancelled, provider=provider.name if provider else "", sent=sent)
+
+        if key is not None:
+            self.cache.set(key, model, content)
+
+    def generate_async(self, prompt, model=None, use_cache=True, stream=False, prompt_key=None, **params):
+        """
+        Async counterpart of `generate` backed by the pooled AsyncOpenAI client.
+
+        Returns:
+            A coroutine resolving to the response text, or an async generator of
+            partial texts when streaming
+        """
+        use_model = model or self.model
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(use_model, prompt, params)
+
+        if stream:
+            return self._stream_async(prompt, use_model, key, use_cache, prompt_key, params)
+        return self._generate_async(prompt, use_model, key, use_cache, prompt_key, params)
+
+    async def _generate_async(self, prompt, model, key, use_cache, prompt_key, params):
+        # The SQLite cache blocks on disk and on its lock, so it is used from a worker thread
+        start = time.perf_counter()
+        if key is not None and use_cache:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                self.metrics.record(prompt_key, model, start, cached=True)
+                return cached
+
+        try:
+            provider, response, sent = await self.policy.create_hedged_async(
+                model, [{"role": "user", "content": prompt}], **params)
+        except Exception as e:
+            self.metrics.record(prompt_key, model, start, error=e)
+            raise
+        content = response.choices[0].message.content
+        self.metrics.record(prompt_key, model, start, usage=response.usage, provider=provider.name, sent=sent)
+
+        if key is not None:
+            await asyncio.to_thread(self.cache.set, key, model, content)
+        return content
+
+    async def _stream_async(self, prompt, model, key, use_cache, prompt_key, params):
+        start = time.perf_counter()
+        if key is not None and use_cache:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                self.metrics.record(prompt_key, model, start, stream=True, cached=True)
+                yield cached
+                return
+
+        content, usage, ttft, provider, sent = "", None, None, None, None
+        error, cancelled = None, False
+        try:
+            provider, response, sent, head = await self.policy.create_hedged_stream_async(
+                model, [{"role": "user", "content": prompt}],
+                stream=True, stream_options={"include_usage": True}, **params)
+            async for chunk in replay(head, response):
+                usage = chunk.usage or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if ttft is None:
+                        ttft = time.perf_counter() - sent
+                    content += delta
+                    yield content
+        except (GeneratorExit, asyncio.CancelledError):
+            # The consumer stopped reading, or its task was cancelled
+            cancelled = True
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self.metrics.record(prompt_key, model, start, usage=usage, ttft=ttft, stream=True, error=error,
+                                cancelled=cancelled, provider=provider.name if provider else "", sent=sent)
+
+        if key is not None:
+            await asyncio.to_thread(self.cache.set, key, model, content)
+
+    def run(self, coroutine):
+        """
+        Run `coroutine` from synchronous code and return its result.
+
+        It runs on one background event loop kept for the life of the interface,
+        so the pooled async connections are never shared with a closed loop.
+        Interrupting the caller cancels the coroutine.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-sync-loop", daemon=True).start()
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def iterate(self, generator):
+        """Iterate the async `generator` from synchronous code through `run`; closing the iterator closes it."""
+        try:
+            while True:
+                try:
+                    yield self.run(generator.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.run(generator.aclose())
+
+    def warm(self):
+        """Load the models of a local provider now and keep them resident, instead of on the first request."""
+        for provider in self.providers:
+            if provider.local:
+                provider.start_keepalive()
+
+    async def aclose(self):
+        """Release the pooled HTTP connections of every provider."""
+        for provider in self.providers:
+            await provider.aclose()
+
+    def cache_stats(self):
+        """Hit/miss counters and size of the response cache (empty when disabled)."""
+        return self.cache.stats() if self.cache is not None else {}
+
+    def __http_settings(self, http_config):
+        limits = httpx.Limits(
+            max_connections=int(http_config.get('maxConnections', 100)),
+            max_keepalive_connections=int(http_config.get('maxKeepalive', 20)),
+            keepalive_expiry=float(http_config.get('keepaliveExpiry', 30))
+        )
+        timeout = httpx.Timeout(
+            float(http_config.get('timeout', 120)),
+            connect=float(http_config.get('connectTimeout', 10))
         )
-        
-        return response.choices[0].message.content
+        return limits, timeout
+
+
+async def replay(head, response):
+    """The chunks already read from a stream, then the rest of it."""
+    for chunk in head:
+        yield chunk
+    async for chunk in response:
+        yield chunk
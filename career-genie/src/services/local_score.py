@@ -0,0 +1,130 @@
+from .prompt_budget import terms
+from .templates import registry
+
+# Words common to most job descriptions that say nothing about the required skills
+GENERIC = frozenset("""
+ability able across apply benefits best build candidate candidates company culture customer customers day
+degree description environment etc excellent experience field good great help ideal including job join
+knowledge least looking make need needs new opportunity plus position preferred required requirements responsibilities
+role seeking skills strong team teams understanding using well work working world years year yrs you'll we're
+""".split())
+
+# Two-character terms that are skills; other short tokens are fragments such as "us", "do" or the "ll" of "you'll"
+SHORT_SKILLS = frozenset("""
+ai ml dl cv ui ux qa bi js ts go db ci cd os vm ar vr pm hr c# f#
+""".split())
+
+
+def keywords(text):
+    return [
+        t for t in terms(text)
+        if t not in GENERIC and (len(t) > 2 or t in SHORT_SKILLS) and not t.isdigit()
+    ]
+
+
+class LocalScore:
+    """
+    Network-free resume-vs-JD scorer for triaging many job descriptions.
+
+    Every JD in a batch is weighted with BM25 (term frequency saturation and
+    IDF across the batch) in one sparse matrix, and scored by the share of its
+    keyword weight found in the base resume. The base resume's keyword set is
+    indexed once and rebuilt only when the file changes. Use it to pick the
+    JDs worth a full `BaseScore` LLM call.
+    """
+
+    def __init__(self, config):
+        self.config=config
+        local=config.get('local', {})
+        self.keywords = int(local.get('keywords', 25))
+        self.k1 = float(local.get('k1', 1.5))
+        self.b = float(local.get('b', 0.75))
+        self._resume = None
+        self._index = frozenset()
+
+    def get_resume(self):
+        return registry.get(self.config['input']['baseResume'])
+
+    def resume_index(self):
+        resume = self.get_resume()
+        if resume != self._resume:
+            self._resume, self._index = resume, frozenset(keywords(resume))
+        return self._index
+
+    def score(self, jd):
+        return self.rank([jd])[0]
+
+    def rank(self, jds):
+        """
+        Score every JD against the base resume, best match first.
+
+        Returns:
+            A list of dicts with the JD's `index` in `jds`, its `score` (0-100) and
+            its top `matched` and `missing` keywords
+        """
+        import numpy as np
+        from scipy import sparse
+
+        if not jds:
+            return []
+        vocabulary, rows, cols = {}, [], []
+        for row, jd in enumerate(jds):
+            for term in keywords(jd):
+                rows.append(row)
+                cols.append(vocabulary.setdefault(term, len(vocabulary)))
+        shape = (len(jds), len(vocabulary))
+        counts = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape)
+        counts.sum_duplicates()
+
+        # BM25 weight of every (JD, term) pair, computed on the non-zero entries only
+        df = np.bincount(counts.indices, minlength=shape[1])
+        idf = np.log1p((shape[0] - df + 0.5) / (df + 0.5))
+        lengths = np.asarray(counts.sum(axis=1)).ravel()
+        norm = self.k1 * (1 - self.b + self.b * lengths / (lengths.mean() or 1))
+        tf = counts.data
+        weights = counts.copy()
+        weights.data = idf[counts.indices] * tf * (self.k1 + 1) / (tf + np.repeat(norm, np.diff(counts.indptr)))
+
+        terms_by_id = np.array(list(vocabulary), dtype=object)
+        index = self.resume_index()
+        present = np.fromiter((term in index for term in vocabulary), dtype=float, count=shape[1])
+        matched = weights @ present
+        total = np.asarray(weights.sum(axis=1)).ravel()
+        scores = np.divide(100 * matched, total, out=np.zeros_like(total), where=total > 0)
+
+        results = []
+        for row in range(shape[0]):
+            start, end = weights.indptr[row], weights.indptr[row + 1]
+            top = start + np.argsort(-weights.data[start:end], kind="stable")[:self.keywords]
+            ids = weights.indices[top]
+            results.append({
+                "index": row,
+                "score": round(float(scores[row]), 1),
+                "matched": list(terms_by_id[ids[present[ids] > 0]]),
+                "missing": list(terms_by_id[ids[present[ids] == 0]]),
+            })
+        return sorted(results, key=lambda r: -r["score"])
+
+
+def split_jds(text):
+    """Split pasted job descriptions separated by a line containing only `---`."""
+    jds, current = [], []
+    for line in (text or "").splitlines():
+        if line.strip() == "---":
+            jds.append("\n".join(current).strip())
+            current = []
+        else:
+            current.append(line)
+    jds.append("\n".join(current).strip())
+    return [jd for jd in jds if jd]
+
+
+def format_ranking(results, jds):
+    """Render a ranking as a Markdown table."""
+    lines = ["| Rank | Score | Job Description | Matched | Missing |", "|---|---|---|---|---|"]
+    for rank, result in enumerate(results, 1):
+        first_line = jds[result["index"]].strip().splitlines()[0][:60].replace("|", "\\|")
+        lines.append(
+            f"| {rank} | {result['score']:.1f} | {first_line} "
+            f"| {', '.join(result['matched'][:10])} | {', '.join(result['missing'][:10])} |")
+    return "\n".join(lines)
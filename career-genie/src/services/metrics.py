@@ -0,0 +1,186 @@
+import json
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+@dataclass
+class CallRecord:
+    key: str
+    model: str
+    latency: float
+    provider: str = ""
+    queued: float = 0.0
+    ttft: float | None = None
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+    stream: bool = False
+    cached: bool = False
+    cancelled: bool = False
+    error: str = ""
+    timestamp: float = field(default_factory=time.time)
+
+    @property
+    def result(self):
+        if self.cached:
+            return "cached"
+        if self.cancelled:
+            return "cancelled"
+        return "error" if self.error else "ok"
+
+
+class Metrics:
+    """
+    In-process aggregator of LLM call records.
+
+    Keeps the most recent `max_records` calls and summarises them per prompt key
+    (`ats`, `resume`, `profile.interview`, ...) with latency, queue wait and
+    time-to-first-token percentiles and token totals. Call and token counts are
+    also kept as counters over the life of the process.
+    """
+
+    def __init__(self, max_records=10000):
+        self.records = deque(maxlen=int(max_records))
+        # (key, model, result) -> calls and (key, model, "prompt" | "completion") -> tokens, never trimmed
+        self.calls = Counter()
+        self.tokens = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, key, model, start, usage=None, ttft=None, stream=False, cached=False, error=None, provider="",
+               sent=None, cancelled=False):
+        """
+        Record a call that started at `start` (a `time.perf_counter()` value) and just finished.
+
+        `sent` is when the provider request went out; the time before it, spent on rate
+        limits and failover backoff, is recorded as `queued` rather than as latency.
+        """
+        sent = start if sent is None else sent
+        entry = CallRecord(
+            key=key or "unknown",
+            model=model,
+            latency=time.perf_counter() - sent,
+            provider=provider,
+            queued=sent - start,
+            ttft=ttft,
+            prompt_tokens=getattr(usage, 'prompt_tokens', None),
+            completion_tokens=getattr(usage, 'completion_tokens', None),
+            stream=stream,
+            cached=cached,
+            cancelled=cancelled,
+            error=str(error) if error else "",
+        )
+        with self._lock:
+            self.records.append(entry)
+            self.calls[(entry.key, entry.model, entry.result)] += 1
+            self.tokens[(entry.key, entry.model, "prompt")] += entry.prompt_tokens or 0
+            self.tokens[(entry.key, entry.model, "completion")] += entry.completion_tokens or 0
+        return entry
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.records)
+
+    def summary(self):
+        groups = {}
+        for record in self.snapshot():
+            groups.setdefault((record.key, record.model), []).append(record)
+
+        summary = []
+        for (key, model), records in sorted(groups.items()):
+            calls = [r for r in records if r.result == "ok"]
+            latencies = [r.latency for r in calls]
+            ttfts = [r.ttft for r in calls if r.ttft is not None]
+            summary.append({
+                "key": key,
+                "model": model,
+                "calls": len(records),
+                "cached": sum(1 for r in records if r.cached),
+                "cancelled": sum(1 for r in records if r.result == "cancelled"),
+                "errors": sum(1 for r in records if r.result == "error"),
+                "providers": sorted({r.provider for r in records if r.provider}),
+                "promptTokens": sum(r.prompt_tokens or 0 for r in calls),
+                "completionTokens": sum(r.completion_tokens or 0 for r in calls),
+                "latency": percentiles(latencies),
+                "queued": percentiles([r.queued for r in calls]),
+                "ttft": percentiles(ttfts),
+            })
+        return summary
+
+    def to_jsonl(self):
+        return "".join(json.dumps(asdict(r)) + "\n" for r in self.snapshot())
+
+    def export_jsonl(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_jsonl())
+
+    def prometheus(self):
+        """Render the counters, and the summary of the recent calls, in the Prometheus text exposition format."""
+        with self._lock:
+            calls, tokens = dict(self.calls), dict(self.tokens)
+
+        lines = [
+            "# HELP llm_calls_total LLM calls by prompt key and model.",
+            "# TYPE llm_calls_total counter",
+        ]
+        for (key, model, result), count in sorted(calls.items()):
+            lines.append(f'llm_calls_total{{key="{key}",model="{model}",result="{result}"}} {count}')
+
+        lines += ["# HELP llm_tokens_total Tokens sent and received.", "# TYPE llm_tokens_total counter"]
+        for (key, model, kind), count in sorted(tokens.items()):
+            lines.append(f'llm_tokens_total{{key="{key}",model="{model}",type="{kind}"}} {count}')
+
+        summary = self.summary()
+        for metric, name, help_text in (
+            ("latency", "llm_latency_seconds", "Provider latency of uncached LLM calls, from sending the request."),
+            ("queued", "llm_queue_seconds", "Time LLM calls waited for rate limits and failover backoff before sending."),
+            ("ttft", "llm_ttft_seconds", "Time to first token of streamed LLM calls, from sending the request."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for s in summary:
+                if not s[metric]:
+                    continue
+                labels = f'key="{s["key"]}",model="{s["model"]}"'
+                for q, quantile in (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99")):
+                    lines.append(f'{name}{{{labels},quantile="{quantile}"}} {s[metric][q]:.4f}')
+        return "\n".join(lines) + "\n"
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(pct):
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+    return {"p50": pick(50), "p95": pick(95), "p99": pick(99), "count": len(ordered)}
+
+
+def serve(metrics, port, host="127.0.0.1"):
+    """Serve `/metrics` (Prometheus text) and `/metrics.jsonl` from a background thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = metrics.prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.jsonl":
+                body, content_type = metrics.to_jsonl(), "application/x-ndjson"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, int(port)), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving LLM metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,90 @@
+from abc import ABC, abstractmethod
+
+import pdfkit
+import pypandoc
+
+from .utils import read
+
+
+class PdfBackend(ABC):
+    """Renders Markdown to a PDF file. Subclasses load their assets once in `__init__`."""
+
+    name = None
+
+    def __init__(self, config):
+        self.config = config
+
+    @abstractmethod
+    def render(self, md_text, output_path):
+        """Write the PDF for `md_text` to `output_path`."""
+
+    def settings(self):
+        """Everything that affects the output, used to key the export cache."""
+        return {"backend": self.name}
+
+
+class LatexBackend(PdfBackend):
+    """Pandoc with a TeX engine (`export.args.pdf`): best typography, slowest."""
+
+    name = "latex"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.args = config['args'].get("pdf", [])
+
+    def render(self, md_text, output_path):
+        pypandoc.convert_text(
+            md_text,
+            "pdf",
+            format="md",
+            outputfile=output_path,
+            extra_args=self.args
+        )
+
+    def settings(self):
+        return {"backend": self.name, "args": self.args}
+
+
+class HtmlBackend(PdfBackend):
+    """Pandoc Markdown to HTML, then wkhtmltopdf via pdfkit. No TeX run."""
+
+    name = "html"
+
+    def __init__(self, config):
+        super().__init__(config)
+        html_config = config.get('html', {})
+        self.css = read(html_config['css']) if html_config.get('css') else ""
+        self.options = html_config.get('options', {})
+        self.args = html_config.get('args', [])
+        # Resolving the wkhtmltopdf binary is done once instead of per export
+        self.pdfkit_config = pdfkit.configuration(wkhtmltopdf=html_config.get('wkhtmltopdf', ''))
+        self.shell = (
+            '<!DOCTYPE html><html><head><meta charset="utf-8">'
+            f'<style>{self.css}</style></head><body>{{body}}</body></html>'
+        )
+
+    def render(self, md_text, output_path):
+        body = pypandoc.convert_text(md_text, "html5", format="md", extra_args=self.args)
+        pdfkit.from_string(
+            self.shell.replace("{body}", body),
+            output_path,
+            options=self.options,
+            configuration=self.pdfkit_config
+        )
+
+    def settings(self):
+        return {"backend": self.name, "css": self.css, "options": self.options, "args": self.args}
+
+
+BACKENDS = {
+    LatexBackend.name: LatexBackend,
+    HtmlBackend.name: HtmlBackend,
+}
+
+
+def create_backend(config):
+    """Instantiate the PDF backend named by `export.pdfBackend` (default: latex)."""
+    name = config.get('pdfBackend', LatexBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{name}'. Available: {sorted(BACKENDS)}")
+    return BACKENDS[name](config)
@@ -0,0 +1,150 @@
+import asyncio
+import contextlib
+import time
+
+
+class Step:
+    """A pipeline node: `run(results)` is awaited once every step in `depends` has succeeded."""
+
+    def __init__(self, name, run, depends=()):
+        self.name = name
+        self.run = run
+        self.depends = tuple(depends)
+
+
+class StepResult:
+    def __init__(self, name, status="pending", output=None, error=None, started=None, elapsed=None):
+        self.name = name
+        self.status = status
+        self.output = output
+        self.error = error
+        self.started = started
+        self.elapsed = elapsed
+
+
+class Pipeline:
+    """
+    Runs a dependency graph of async steps.
+
+    Every step starts as soon as all of its dependencies have finished, so
+    independent steps run concurrently and the total wall-clock time follows
+    the critical path rather than the sum of all steps. A failed step marks
+    every step depending on it as skipped.
+    """
+
+    def __init__(self, steps):
+        self.steps = {step.name: step for step in steps}
+        for step in steps:
+            missing = [dep for dep in step.depends if dep not in self.steps]
+            if missing:
+                raise ValueError(f"Step '{step.name}' depends on unknown steps: {missing}")
+
+    async def run(self):
+        """
+        Execute the graph.
+
+        Yields:
+            dict[str, StepResult]: A snapshot of every step after each state change.
+        """
+        results = {name: StepResult(name) for name in self.steps}
+        outputs = {}
+        running = {}
+        start = time.perf_counter()
+
+        def launch_ready():
+            for name, step in self.steps.items():
+                state = results[name]
+                if state.status != "pending":
+                    continue
+                deps = [results[dep] for dep in step.depends]
+                if any(dep.status in ("failed", "skipped") for dep in deps):
+                    state.status = "skipped"
+                    state.error = "dependency failed"
+                elif all(dep.status == "done" for dep in deps):
+                    state.status = "running"
+                    state.started = time.perf_counter() - start
+                    running[asyncio.ensure_future(step.run(dict(outputs)))] = name
+
+        launch_ready()
+        yield results
+        try:
+            while running:
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    name = running.pop(task)
+                    state = results[name]
+                    state.elapsed = time.perf_counter() - start - state.started
+                    if task.exception() is not None:
+                        state.status = "failed"
+                        state.error = str(task.exception())
+                    else:
+                        state.status = "done"
+                        state.output = task.result()
+                        outputs[name] = state.output
+                # Skipping can cascade, so resolve until no more steps change state
+                before = None
+                while before != [r.status for r in results.values()]:
+                    before = [r.status for r in results.values()]
+                    launch_ready()
+                yield results
+        finally:
+            for task in running:
+                task.cancel()
+
+
+class ApplicationPack:
+    """Builds the full application pack (resume, cover letter, checks and outreach) as one pipeline."""
+
+    def __init__(self, resume, cover_letter, ats, score, email, profile):
+        self.resume = resume
+        self.cover_letter = cover_letter
+        self.ats = ats
+        self.score = score
+        self.email = email
+        self.profile = profile
+
+    def build(self, jd, company, title, context, use_cache=True, admit=None):
+        """
+        Args:
+            admit: Optional async context manager factory held around each step, e.g. a
+                slot of the UI's LLM admission gate, since the steps run concurrently
+        """
+        base_resume = self.resume.get_resume()
+        admit = admit or contextlib.nullcontext
+
+        def admitted(run):
+            async def step(results):
+                async with admit():
+                    return await run(results)
+            return step
+
+        steps = [
+            Step("resume", lambda r: self.resume.generate_async(jd, company, title, context, use_cache)),
+            Step("coverLetter", lambda r: self.cover_letter.generate_async(jd, company, title, context, use_cache)),
+            Step("score", lambda r: self.score.check_async(jd, use_cache)),
+            Step("aboutMe", lambda r: self.profile.linkedin_about_me_async(base_resume, use_cache)),
+            Step("ats", lambda r: self.ats.check_async(jd, company, title, r["resume"], use_cache),
+                 depends=["resume"]),
+            Step("applyEmail", lambda r: self.email.apply_email_async(title, company, r["resume"], jd, use_cache),
+                 depends=["resume"]),
+            Step("interview", lambda r: self.profile.interview_async(title, jd, r["resume"], use_cache),
+                 depends=["resume"]),
+            Step("connection", lambda r: self.profile.linkedin_connection_async(jd, r["resume"], use_cache),
+                 depends=["resume"]),
+        ]
+        return Pipeline([Step(step.name, admitted(step.run), step.depends) for step in steps])
+
+    async def run(self, jd, company, title, context, use_cache=True, admit=None):
+        async for results in self.build(jd, company, title, context, use_cache, admit).run():
+            yield results
+
+
+def format_progress(results):
+    """Render step states and timings as a Markdown table."""
+    lines = ["| Step | Status | Started (s) | Duration (s) |", "|---|---|---|---|"]
+    for state in results.values():
+        started = f"{state.started:.1f}" if state.started is not None else "-"
+        elapsed = f"{state.elapsed:.1f}" if state.elapsed is not None else "-"
+        status = f"{state.status}: {state.error}" if state.error else state.status
+        lines.append(f"| {state.name} | {status} | {started} | {elapsed} |")
+    return "\n".join(lines)
@@ -0,0 +1,143 @@
+import asyncio
+import contextlib
+from collections import OrderedDict
+
+from .incremental import digest
+
+
+class Prefetcher:
+    """
+    Speculatively runs the JD-only LLM calls while the user is still editing.
+
+    `schedule` is called on every change of the job description; once the text
+    has been stable for `debounce` seconds it starts the base resume score, which
+    also runs (and memoizes) the JD analysis that resume, cover letter and ATS
+    generation wait on. A newer JD from the same session cancels the previous
+    speculative work, unless a click is already waiting on it. Results are kept
+    per JD and base resume for `maxEntries` JDs, so a click on an already
+    prefetched JD returns at once. Used from a single event loop, like the UI's
+    async handlers.
+
+    The speculative call holds a slot from `admit` while it runs, like any other
+    LLM call of the UI; when no slot is available the prefetch is dropped and a
+    click makes its own call.
+    """
+
+    def __init__(self, config, score):
+        config = config or {}
+        self.score = score
+        self.enabled = config.get('enabled', True)
+        self.debounce = float(config.get('debounce', 0.8))
+        self.min_chars = int(config.get('minChars', 200))
+        self.max_entries = int(config.get('maxEntries', 32))
+        self._entries = OrderedDict()
+        self._claimed = set()
+        self._sessions = {}
+
+    def key(self, jd):
+        return self.score.jd_analysis.fingerprint(jd), digest(self.score.get_resume())
+
+    def schedule(self, session, jd, admit=None):
+        """
+        Restart the debounce timer of `session` for a new `jd`, cancelling its earlier speculative work.
+
+        Args:
+            admit: Returns an async context manager holding an LLM slot for the speculative call
+        """
+        previous = self._sessions.pop(session, None)
+        if previous is not None:
+            self._cancel(*previous)
+        if not self.enabled or len((jd or "").strip()) < self.min_chars:
+            return
+
+        key = self.key(jd)
+        timer = asyncio.ensure_future(self._start(session, jd, key, admit or contextlib.nullcontext))
+        self._sessions[session] = (timer, key)
+
+    async def _start(self, session, jd, key, admit):
+        await asyncio.sleep(self.debounce)
+        timer = asyncio.current_task()
+        if key in self._entries:
+            # Already prefetched, or started by another session which owns it
+            self._entries.move_to_end(key)
+            self._forget(session, timer)
+            return
+
+        task = asyncio.ensure_future(self._score(jd, admit))
+        self._entries[key] = task
+        task.add_done_callback(lambda t: self._settled(key, t))
+        task.add_done_callback(lambda t: self._forget(session, timer))
+        while len(self._entries) > self.max_entries:
+            stale, old = self._entries.popitem(last=False)
+            if not old.done() and stale not in self._claimed:
+                old.cancel()
+
+    async def _score(self, jd, admit):
+        async with admit():
+            return await self.score.check_async(jd, True)
+
+    def _cancel(self, timer, key):
+        timer.cancel()
+        if not timer.done() or timer.cancelled():
+            # Still debouncing: nothing was started
+            return
+        task = self._entries.get(key)
+        if task is not None and not task.done() and key not in self._claimed:
+            task.cancel()
+
+    def _forget(self, session, timer):
+        if self._sessions.get(session, (None,))[0] is timer:
+            del self._sessions[session]
+
+    def _settled(self, key, task):
+        self._claimed.discard(key)
+        if (task.cancelled() or task.exception() is not None) and self._entries.get(key) is task:
+            del self._entries[key]
+
+    def take(self, jd):
+        """The prefetched (or still running) score task for `jd`, or None; a taken task is never cancelled."""
+        key = self.key(jd)
+        task = self._entries.get(key)
+        if task is None:
+            return None
+        self._entries.move_to_end(key)
+        if not task.done():
+            self._claimed.add(key)
+        return task
+
+    async def prefetched(self, jd, use_cache=True):
+        """The prefetched score for `jd`, waiting for it if it is still running; None when there is none."""
+        task = self.take(jd) if use_cache else None
+        if task is None:
+            return None
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+        except Exception:
+            # A failed prefetch is retried by the caller's own call, which reports the error
+            pass
+        return None
+
+    async def score_async(self, jd, use_cache=True):
+        result = await self.prefetched(jd, use_cache)
+        if result is not None:
+            return result
+        return await self.score.check_async(jd, use_cache)
+
+    async def score_stream_async(self, jd, use_cache=True):
+        """`BaseScore.check_stream_async`, answered from the prefetched result when there is one."""
+        result = await self.prefetched(jd, use_cache)
+        if result is not None:
+            yield result
+            return
+        async for partial in self.score.check_stream_async(jd, use_cache):
+            yield partial
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "running": sum(not task.done() for task in self._entries.values()),
+            "sessions": len(self._sessions),
+        }
@@ -1,33 +1,103 @@
+from .prompt_budget import PromptBudget
+from .templates import registry
+
 class Profile:
     def __init__(self, config, llm_interface):
         self.config=config
         self.llm=llm_interface
+        self.budget=PromptBudget(self.config.get('budget'))
+        templates=self.templates(config)
+        self.interview_template=registry.formatter(*templates['interview_template'])
+        self.connection_template=registry.formatter(*templates['connection_template'])
+        self.about_me_template=registry.formatter(*templates['about_me_template'])
+
+    @staticmethod
+    def templates(config):
+        """{attribute: (source, placeholders)} of the templates the service binds; `Services.validate` checks them without building it."""
+        return {
+            'interview_template': (config.get('interview'), {'role', 'job_description', 'resume'}),
+            'connection_template': (config.get('inConnectionRequest'), {'job_description', 'resume'}),
+            'about_me_template': (config.get('inAboutMe'), {'resume'}),
+        }
+
+    def interview(self, role, job_description, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.interview_prompt(role, job_description, resume)
+        return self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='profile.interview')
+
+    def interview_stream(self, role, job_description, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.interview_prompt(role, job_description, resume)
+        yield from self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='profile.interview', stream=True)
+
+    async def interview_async(self, role, job_description, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.interview_prompt(role, job_description, resume)
+        return await self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='profile.interview')
+
+    async def interview_stream_async(self, role, job_description, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.interview_prompt(role, job_description, resume)
+        async for partial in self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='profile.interview', stream=True):
+            yield partial
+
+    def linkedin_connection(self, job_description, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.linkedin_connection_prompt(job_description, resume)
+        return self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='profile.inConnectionRequest')
+
+    def linkedin_connection_stream(self, job_description, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.linkedin_connection_prompt(job_description, resume)
+        yield from self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='profile.inConnectionRequest', stream=True)
 
-    def interview(self, role, job_description, resume):
-        template = self.config.get('interview')
+    async def linkedin_connection_async(self, job_description, resume, use_cache=True):
         model=self.config['model']
-        prompt = template.format(
+        prompt = self.linkedin_connection_prompt(job_description, resume)
+        return await self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='profile.inConnectionRequest')
+
+    async def linkedin_connection_stream_async(self, job_description, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.linkedin_connection_prompt(job_description, resume)
+        async for partial in self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='profile.inConnectionRequest', stream=True):
+            yield partial
+
+    def linkedin_about_me(self, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.linkedin_about_me_prompt(resume)
+        return self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='profile.inAboutMe')
+
+    def linkedin_about_me_stream(self, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.linkedin_about_me_prompt(resume)
+        yield from self.llm.generate(prompt, model, use_cache=use_cache, prompt_key='profile.inAboutMe', stream=True)
+
+    async def linkedin_about_me_async(self, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.linkedin_about_me_prompt(resume)
+        return await self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='profile.inAboutMe')
+
+    async def linkedin_about_me_stream_async(self, resume, use_cache=True):
+        model=self.config['model']
+        prompt = self.linkedin_about_me_prompt(resume)
+        async for partial in self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key='profile.inAboutMe', stream=True):
+            yield partial
+
+    def interview_prompt(self, role, job_description, resume):
+        return self.interview_template(
             role=role,
-            job_description=job_description,
-            resume=resume
+            job_description=self.budget.fit('job_description', job_description),
+            resume=self.budget.fit('resume', resume, job_description)
         )
-        return self.llm.generate(prompt, model)
 
-    def linkedin_connection(self, job_description, resume):
-        template = self.config.get('inConnectionRequest')
-        model=self.config['model']
-        prompt = template.format(
-            job_description=job_description,
-            resume=resume
+    def linkedin_connection_prompt(self, job_description, resume):
+        return self.connection_template(
+            job_description=self.budget.fit('job_description', job_description),
+            resume=self.budget.fit('resume', resume, job_description)
         )
-        return self.llm.generate(prompt, model)
 
-    def linkedin_about_me(self, resume):
-        template = self.config.get('inAboutMe')
-        model=self.config['model']
-        prompt = template.format(
-            resume=resume
+    def linkedin_about_me_prompt(self, resume):
+        return self.about_me_template(
+            resume=self.budget.fit('resume', resume, '')
         )
-        return self.llm.generate(prompt, model)
 
-    
\ No newline at end of file
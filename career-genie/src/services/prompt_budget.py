@@ -0,0 +1,170 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+# Rough characters-per-token ratio of BPE tokenizers on English prose
+CHARS_PER_TOKEN = 4
+
+HEADING = re.compile(r"^(#{1,6})\s+\S")
+WORD = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-/][a-z0-9+#]+)*")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or our that the their this to was we were will
+with you your they them than then there these those who what when where which while about into over under
+all any can may must should would could also more most other such not no only own same so too very just
+""".split())
+
+
+def estimate_tokens(text):
+    """Estimate the token count of `text` without a tokenizer."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def terms(text):
+    return [w for w in WORD.findall((text or "").lower()) if w not in STOPWORDS]
+
+
+@dataclass
+class Section:
+    index: int
+    level: int
+    text: str
+    parent: int | None = None
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self.text)
+
+    @property
+    def has_body(self):
+        return bool(self.text.partition("\n")[2].strip()) if self.level else bool(self.text.strip())
+
+
+def split_sections(markdown):
+    """
+    Split Markdown into heading sections, in document order.
+
+    Text before the first heading is a level-0 section. Each section records the
+    closest enclosing heading as its parent, so a selected `### Role` keeps its
+    `## Experience` heading.
+    """
+    sections, stack, lines = [], [], []
+    level = 0
+
+    def close():
+        if lines and (level or "".join(lines).strip()):
+            parents = [s for s in stack if s.level < level]
+            section = Section(len(sections), level, "\n".join(lines).strip("\n"),
+                              parents[-1].index if parents else None)
+            sections.append(section)
+            stack[:] = parents + [section]
+
+    in_code = False
+    for line in markdown.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        match = None if in_code else HEADING.match(line)
+        if match:
+            close()
+            lines, level = [], len(match.group(1))
+        lines.append(line)
+    close()
+    return sections
+
+
+def bm25(documents, query, k1=1.5, b=0.75):
+    """Okapi BM25 score of every document (a list of terms) against the query terms."""
+    if not documents:
+        return []
+    avg_length = sum(len(d) for d in documents) / len(documents) or 1
+    frequencies = Counter(t for d in documents for t in set(d))
+    query_terms = Counter(query)
+    scores = []
+    for document in documents:
+        counts = Counter(document)
+        score = 0.0
+        for term, weight in query_terms.items():
+            tf = counts.get(term)
+            if not tf:
+                continue
+            idf = math.log(1 + (len(documents) - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+            score += weight * idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(document) / avg_length))
+        scores.append(score)
+    return scores
+
+
+def select_sections(markdown, query, budget):
+    """
+    Keep the sections of `markdown` most relevant to `query` within `budget` tokens.
+
+    The preamble (name, contact details) is always kept. Remaining sections are
+    added best-first by BM25 score, each with its parent headings, and the result
+    is returned in the original document order. An empty query scores every
+    section alike, so sections are then kept in document order whatever the JD.
+    """
+    sections = split_sections(markdown)
+    scores = bm25([terms(s.text) for s in sections], terms(query))
+    chosen = {s.index for s in sections if s.level == 0}
+    used = sum(sections[i].tokens for i in chosen)
+
+    ranked = sorted((s for s in sections if s.level and s.has_body), key=lambda s: (-scores[s.index], s.index))
+    for section in ranked:
+        needed = [section.index]
+        parent = section.parent
+        while parent is not None and parent not in chosen:
+            needed.append(parent)
+            parent = sections[parent].parent
+        cost = sum(sections[i].tokens for i in needed)
+        if used + cost <= budget:
+            chosen.update(needed)
+            used += cost
+    return "\n\n".join(s.text for s in sections if s.index in chosen)
+
+
+def truncate(text, budget):
+    """Keep whole paragraphs of `text` from the start until `budget` tokens are used."""
+    kept, used = [], 0
+    for paragraph in re.split(r"\n\s*\n", text):
+        cost = estimate_tokens(paragraph)
+        if used + cost > budget:
+            if not kept:
+                kept.append(paragraph[:budget * CHARS_PER_TOKEN])
+            break
+        kept.append(paragraph)
+        used += cost
+    return "\n\n".join(kept)
+
+
+def prefix_query(llm, query):
+    """
+    The query to reduce a prompt's leading base resume by.
+
+    On a local server the base resume is part of the prompt prefix its KV cache
+    reuses across JDs, so it is reduced without the JD (`""`) and stays the same
+    for every call; hosted providers get the sections most relevant to the JD.
+    """
+    return "" if llm.use_local else query
+
+
+class PromptBudget:
+    """
+    Per-prompt token limits for the large inputs of a template.
+
+    Configured as `"budget": {"base_resume": 1500, "job_description": 1200, ...}`
+    next to a prompt in `data/config.json`, keyed by template placeholder.
+    Text given a `query` (the JD) is reduced to its most relevant Markdown
+    sections; other text keeps its leading paragraphs. Inputs without a limit, or
+    already within it, pass through unchanged.
+    """
+
+    def __init__(self, config=None):
+        self.limits = {field: int(limit) for field, limit in (config or {}).items() if limit}
+
+    def fit(self, field, text, query=None):
+        limit = self.limits.get(field)
+        if not limit or not text or estimate_tokens(text) <= limit:
+            return text
+        if query is not None:
+            text = select_sections(text, query, limit)
+        # Unsectioned text (or an oversized preamble) is cut at paragraph boundaries
+        return truncate(text, limit) if estimate_tokens(text) > limit else text
@@ -0,0 +1,373 @@
+import asyncio
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncOpenAI,
+    InternalServerError,
+    NOT_GIVEN,
+    NotFoundError,
+    OpenAI,
+    RateLimitError,
+)
+
+from .rate_limit import create_bucket
+
+# Errors worth retrying on the same or another provider; anything else is raised as is
+RETRYABLE = (APITimeoutError, APIConnectionError, InternalServerError)
+
+
+class Provider:
+    """One OpenAI-compatible endpoint with its own clients, request quota and throttle state."""
+
+    def __init__(self, name, config, limits, timeout):
+        self.name = name
+        self.config = config
+        self.local = name == "local"
+        if self.local:
+            # Local LLM server (e.g., Ollama); local servers typically don't need an API key
+            base_url = config.get('url', 'http://localhost:11434/v1')
+            api_key = 'not-required'
+        else:
+            # Remote providers (Groq, OpenRouter, etc.)
+            base_url = config.get('url')
+            api_key = config['apiKey']
+
+        # Retries are handled by the failover policy, not inside the client
+        self.http_client = httpx.Client(limits=limits, timeout=timeout)
+        self.client = OpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            max_retries=0,
+            http_client=self.http_client
+        )
+        self.async_client = AsyncOpenAI(
+            base_url=base_url,
+            api_key=api_key,
+            max_retries=0,
+            http_client=httpx.AsyncClient(limits=limits, timeout=timeout)
+        )
+        self.model = config.get('model')
+        self.model_map = config.get('modelMap', {})
+        self.deadline = float(config['deadline']) if config.get('deadline') else NOT_GIVEN
+        self.bucket = create_bucket(config.get('rateLimit'))
+        self.blocked_until = 0.0
+        self.base_url = base_url
+        self._keepalive = None
+        # Preload state: whether the server has Ollama's native API, and models it does not have
+        self._native = True
+        self._missing = set()
+
+    def resolve_model(self, model):
+        """
+        Name of the requested model on this provider.
+
+        A local server only has the models it pulled, so a name it neither maps
+        nor serves (e.g. a remote model during failover) gets its own `model`.
+        """
+        if model in self.model_map:
+            return self.model_map[model]
+        if self.local and self.model and model not in self.local_models():
+            return self.model
+        return model or self.model
+
+    def wait_time(self):
+        return max(0.0, self.blocked_until - time.monotonic())
+
+    def throttle(self, seconds):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+    def observe(self, headers):
+        """Pace the next requests by the x-ratelimit-* headers of a successful response."""
+        for kind, (remaining, reset) in quota(headers).items():
+            if remaining <= 0:
+                # Quota used up: skip this provider until it resets instead of waiting for a 429
+                self.throttle(reset)
+            elif kind == 'requests' and self.bucket is not None:
+                self.bucket.cap(remaining)
+
+    def create(self, model, messages, **params):
+        """Return (response, `time.perf_counter()` when the request was sent, after any rate-limit wait)."""
+        if self.bucket is not None:
+            self.bucket.acquire()
+        sent = time.perf_counter()
+        raw = self.client.chat.completions.with_raw_response.create(
+            model=self.resolve_model(model), messages=messages, timeout=self.deadline, **params)
+        self.observe(raw.headers)
+        return raw.parse(), sent
+
+    async def create_async(self, model, messages, **params):
+        if self.bucket is not None:
+            await self.bucket.acquire_async()
+        sent = time.perf_counter()
+        raw = await self.async_client.chat.completions.with_raw_response.create(
+            model=self.resolve_model(model), messages=messages, timeout=self.deadline, **params)
+        self.observe(raw.headers)
+        return raw.parse(), sent
+
+    async def aclose(self):
+        await self.async_client.close()
+        self.client.close()
+
+    def local_models(self):
+        """Every model name this provider can be asked for: its default model and the `modelMap` targets."""
+        return list(dict.fromkeys([m for m in [self.model, *self.model_map.values()] if m]))
+
+    def preload(self):
+        """
+        Load the local models into memory and pin them for `warmup.keepAlive`.
+
+        Uses Ollama's native `/api/generate` without a prompt, which loads a model
+        and resets its keep-alive timer. Servers without that endpoint get a
+        one-token chat completion instead, which at least loads the model.
+        A model the server does not have is reported once and not tried again.
+
+        Returns:
+            The models still being kept warm
+        """
+        warmup = self.config.get('warmup') or {}
+        native = re.sub(r"/v1/?$", "", self.base_url)
+        models = [model for model in self.local_models() if model not in self._missing]
+        for model in models:
+            start = time.perf_counter()
+            try:
+                missing = self._load(native, model, warmup.get('keepAlive', '30m'))
+            except Exception as e:
+                print(f"Failed to preload local model {model}: {e}")
+                continue
+            if missing:
+                print(f"Local model {model} is not on {self.base_url}, no longer preloading it: {missing}")
+                self._missing.add(model)
+                continue
+            print(f"Local model {model} ready in {time.perf_counter() - start:.1f}s")
+        return [model for model in models if model not in self._missing]
+
+    def _load(self, native, model, keep_alive):
+        """Load `model` on the server; returns why the server does not have it, or "" once loaded."""
+        if self._native:
+            response = self.http_client.post(f"{native}/api/generate", json={"model": model, "keep_alive": keep_alive})
+            if response.status_code != 404:
+                response.raise_for_status()
+                return ""
+            error = ollama_error(response)
+            if "model" in error and "not found" in error:
+                # Ollama's answer for a model that is not pulled, as opposed to a missing endpoint
+                return error
+            self._native = False
+        try:
+            self.client.chat.completions.create(
+                model=model, messages=[{"role": "user", "content": "ok"}], max_tokens=1)
+        except NotFoundError as e:
+            return str(e)
+        return ""
+
+    def start_keepalive(self):
+        """Preload the local models, then refresh their keep-alive every `warmup.interval` seconds in a daemon thread."""
+        warmup = self.config.get('warmup') or {}
+        if not self.local or not warmup.get('enabled', True) or self._keepalive is not None:
+            return self._keepalive
+        interval = float(warmup.get('interval', 240))
+
+        def run():
+            while self.preload() and interval > 0:
+                time.sleep(interval)
+
+        self._keepalive = threading.Thread(target=run, daemon=True)
+        self._keepalive.start()
+        return self._keepalive
+
+
+class FailoverPolicy:
+    """
+    Sends a request to the first provider that is not throttled, in configured order.
+
+    A 429 throttles that provider for as long as its Retry-After / rate-limit reset
+    headers ask and the request moves on to the next provider, as does a successful
+    response reporting that the quota is used up; timeouts (the
+    provider's `deadline`), connection errors and 5xx responses also fail over.
+    Once every provider has been tried, the policy sleeps with jittered exponential
+    backoff (or until the earliest throttle lifts) and starts another round.
+    With `hedgeAfter` set, a second request is sent to another provider when the
+    first has not answered (or, for a stream, sent its first token) in time, and
+    the faster one wins. Hedging runs on the async path; `LLMInterface` sends sync
+    requests through it when hedging is on.
+    """
+
+    def __init__(self, providers, config):
+        self.providers = providers
+        self.max_attempts = int(config.get('maxAttempts', 3))
+        self.base_delay = float(config.get('baseDelay', 0.5))
+        self.max_delay = float(config.get('maxDelay', 8))
+        self.hedge_after = float(config['hedgeAfter']) if config.get('hedgeAfter') else None
+
+    @property
+    def hedging(self):
+        return self.hedge_after is not None and len(self.providers) > 1
+
+    def create(self, model, messages, **params):
+        """Return (provider, response, time sent) for a sync request."""
+        last_error = None
+        for attempt in range(self.max_attempts):
+            for provider in self.providers:
+                if provider.wait_time() > 0:
+                    continue
+                try:
+                    return (provider, *provider.create(model, messages, **params))
+                except RateLimitError as e:
+                    provider.throttle(retry_after(e, self.backoff(attempt)))
+                    last_error = e
+                except RETRYABLE as e:
+                    last_error = e
+            if attempt + 1 < self.max_attempts:
+                time.sleep(self.pause(attempt))
+        raise last_error or RuntimeError("No LLM provider available")
+
+    async def create_async(self, model, messages, offset=0, **params):
+        """Return (provider, response, time sent) for an async request, starting at provider `offset`."""
+        providers = self.providers[offset:] + self.providers[:offset]
+        last_error = None
+        for attempt in range(self.max_attempts):
+            for provider in providers:
+                if provider.wait_time() > 0:
+                    continue
+                try:
+                    return (provider, *await provider.create_async(model, messages, **params))
+                except RateLimitError as e:
+                    provider.throttle(retry_after(e, self.backoff(attempt)))
+                    last_error = e
+                except RETRYABLE as e:
+                    last_error = e
+            if attempt + 1 < self.max_attempts:
+                await asyncio.sleep(self.pause(attempt))
+        raise last_error or RuntimeError("No LLM provider available")
+
+    async def create_hedged_async(self, model, messages, **params):
+        """Like `create_async`, but races a second provider if the first is slower than `hedgeAfter`."""
+        return await self.hedged(lambda offset: self.create_async(model, messages, offset=offset, **params))
+
+    async def create_hedged_stream_async(self, model, messages, **params):
+        """
+        Open a stream like `create_async`, racing a second provider if the first token is slower than `hedgeAfter`.
+
+        Returns:
+            (provider, response, time sent, chunks already read from the response up to the first token)
+        """
+        async def opened(offset):
+            provider, response, sent = await self.create_async(model, messages, offset=offset, **params)
+            head = []
+            try:
+                async for chunk in response:
+                    head.append(chunk)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        break
+            except BaseException:
+                await response.close()
+                raise
+            return provider, response, sent, head
+
+        return await self.hedged(opened, discard=lambda result: result[1].close())
+
+    async def hedged(self, start, discard=None):
+        """
+        Await `start(0)`, racing `start(1)` (the same call from the next provider on) once it is slower than `hedgeAfter`.
+
+        The first successful result wins. The other call is cancelled, or its result
+        passed to the `discard` coroutine function if it finished too.
+        """
+        first = asyncio.ensure_future(start(0))
+        if not self.hedging:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_after)
+        if done:
+            return first.result()
+
+        second = asyncio.ensure_future(start(1))
+        pending, winner = {first, second}, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = task
+                        return task.result()
+            raise first.exception()
+        finally:
+            for task in (first, second):
+                task.cancel()
+                if (discard is not None and task is not winner and task.done() and not task.cancelled()
+                        and task.exception() is None):
+                    await discard(task.result())
+
+    def backoff(self, attempt):
+        """Jittered exponential backoff for `attempt` (full jitter)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def pause(self, attempt):
+        # Sleep at least until the earliest throttled provider is usable again
+        earliest = min(provider.wait_time() for provider in self.providers)
+        return max(self.backoff(attempt), earliest)
+
+
+def ollama_error(response):
+    """The `error` message of an Ollama error response, lower-cased, or ""."""
+    try:
+        error = response.json().get('error')
+    except (ValueError, AttributeError):
+        return ""
+    return error.lower() if isinstance(error, str) else ""
+
+
+def retry_after(error, default):
+    """Seconds to wait after a 429, from Retry-After or the x-ratelimit-* reset headers."""
+    response = getattr(error, 'response', None)
+    headers = response.headers if response is not None else {}
+
+    if headers.get('retry-after-ms'):
+        try:
+            return float(headers['retry-after-ms']) / 1000
+        except ValueError:
+            pass
+    if headers.get('retry-after'):
+        value = headers['retry-after']
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    waits = [reset for remaining, reset in quota(headers).values() if remaining <= 0]
+    return max(waits) if waits else default
+
+
+def quota(headers):
+    """{'requests' | 'tokens': (remaining, seconds until reset)} from the x-ratelimit-* headers present."""
+    found = {}
+    for kind in ('requests', 'tokens'):
+        remaining = headers.get(f'x-ratelimit-remaining-{kind}')
+        reset = headers.get(f'x-ratelimit-reset-{kind}')
+        if remaining is None or not reset:
+            continue
+        try:
+            found[kind] = (float(remaining), parse_duration(reset))
+        except ValueError:
+            continue
+    return found
+
+
+def parse_duration(value):
+    """Parse durations such as '2m59.56s', '250ms' or '7' (seconds)."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {'h': 3600, 'm': 60, 's': 1, 'ms': 0.001}
+    return sum(float(amount) * units[unit] for amount, unit in re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value))
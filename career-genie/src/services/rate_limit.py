@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Request rate limiter shared by sync and async callers.
+
+    Tokens refill continuously at `requests_per_minute / 60` per second up to
+    `burst`; every request takes one token and waits when none are left.
+    """
+
+    def __init__(self, requests_per_minute, burst=1):
+        self.rate = float(requests_per_minute) / 60.0
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take a token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def cap(self, remaining):
+        """Keep at most `remaining` tokens, when the server reports fewer requests left than the bucket holds."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate, float(remaining))
+            self.updated = now
+
+
+def create_bucket(config):
+    """Build a TokenBucket from a `rateLimit` config section, or None when unset."""
+    if not config or not config.get('requestsPerMinute'):
+        return None
+    return TokenBucket(config['requestsPerMinute'], config.get('burst', 1))
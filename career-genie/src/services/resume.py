@@ -1,31 +1,211 @@
-from .utils import read
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .incremental import Draft, base_section, clean, merge, plan
+from .prompt_budget import PromptBudget, prefix_query
+from .templates import registry
 class Resume:
-    def __init__(self, config, llm_interface):
+    def __init__(self, config, llm_interface, jd_analysis, name='resume'):
         self.config=config
+        self.name=name
         self.llm=llm_interface
-        self.base_resume=''
-        fields = self.get_fields()
-        self.base_resume = read(fields['baseResume'])
+        self.jd_analysis=jd_analysis
+        self.budget=PromptBudget(self.config.get('budget'))
+        templates=self.templates(config)
+        self.template=registry.formatter(*templates['template'])
+        # Section-level regeneration, see `revise`
+        self.incremental=self.config.get('incremental')
+        self.section_template=registry.formatter(
+            *templates['section_template']) if self.incremental else None
+
+    @staticmethod
+    def templates(config):
+        """{attribute: (source, placeholders)} of the templates the service binds; `Services.validate` checks them without building it."""
+        templates={'template': (
+            config['prompt'], {'job_title', 'company', 'job_description', 'base_resume', 'context', 'skill_text'})}
+        if config.get('incremental'):
+            templates['section_template']=(
+                config['incremental']['prompt'],
+                {'job_title', 'company', 'job_description', 'context', 'skill_text', 'base_section', 'section'})
+        return templates
+
+    def generate(self, jd, company, title, context, use_cache=True):
+        model=self.config['model']
+        prompt = self.get_prompt(jd, company, title, context, use_cache)
+        return self.llm.generate(prompt, model, use_cache=use_cache, prompt_key=self.name)
 
-    def generate(self, jd, company, title, context):
+    def generate_stream(self, jd, company, title, context, use_cache=True):
         model=self.config['model']
-        
-        fields = self.get_fields()
-        jdAnalysis = fields.get('jdAnalysis',"")
-        analysis=self.llm.generate(jdAnalysis, model)
+        prompt = self.get_prompt(jd, company, title, context, use_cache)
+        yield from self.llm.generate(prompt, model, use_cache=use_cache, prompt_key=self.name, stream=True)
+
+    async def generate_async(self, jd, company, title, context, use_cache=True):
+        model=self.config['model']
+        prompt = await self.get_prompt_async(jd, company, title, context, use_cache)
+        return await self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key=self.name)
+
+    async def generate_stream_async(self, jd, company, title, context, use_cache=True):
+        model=self.config['model']
+        prompt = await self.get_prompt_async(jd, company, title, context, use_cache)
+        async for partial in self.llm.generate_async(prompt, model, use_cache=use_cache, prompt_key=self.name, stream=True):
+            yield partial
+
+    def revise(self, resume, draft, jd, company, title, context, use_cache=True):
+        """
+        Update `resume`, generated from `draft`, for new inputs by regenerating only the affected sections.
+
+        Falls back to `generate` when there is no usable draft or the change is too broad.
+        """
+        planned = self.plan(resume, draft, jd, company, title, context)
+        if planned is None:
+            return self.generate(jd, company, title, context, use_cache)
+        sections, targets = planned
+        if not targets:
+            return resume
+        analysis=self.jd_analysis.analyze(jd, use_cache)
+        with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+            parts = dict(zip(
+                [s.index for s in targets],
+                pool.map(lambda s: self.generate_section(s, jd, company, title, context, analysis, use_cache), targets)))
+        return merge(sections, parts)
+
+    def revise_stream(self, resume, draft, jd, company, title, context, use_cache=True):
+        planned = self.plan(resume, draft, jd, company, title, context)
+        if planned is None:
+            yield from self.generate_stream(jd, company, title, context, use_cache)
+            return
+        sections, targets = planned
+        if not targets:
+            yield resume
+            return
+        analysis=self.jd_analysis.analyze(jd, use_cache)
+        parts = {}
+        with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+            futures = {pool.submit(self.generate_section, s, jd, company, title, context, analysis, use_cache): s for s in targets}
+            for future in as_completed(futures):
+                parts[futures[future].index] = future.result()
+                yield merge(sections, parts)
+
+    async def revise_async(self, resume, draft, jd, company, title, context, use_cache=True, admit=None):
+        """
+        Args:
+            admit: Optional async context manager factory held around each LLM call, e.g. a
+                slot of the UI's LLM admission gate, since the sections run concurrently
+        """
+        admit = admit or contextlib.nullcontext
+        planned = self.plan(resume, draft, jd, company, title, context)
+        if planned is None:
+            async with admit():
+                return await self.generate_async(jd, company, title, context, use_cache)
+        sections, targets = planned
+        if not targets:
+            return resume
+        async with admit():
+            analysis=await self.jd_analysis.analyze_async(jd, use_cache)
+
+        async def run(section):
+            async with admit():
+                return await self.generate_section_async(section, jd, company, title, context, analysis, use_cache)
 
-        template=read(self.config['prompt'])
-        prompt = template.format(
+        outputs = await asyncio.gather(*(run(s) for s in targets))
+        return merge(sections, {s.index: output for s, output in zip(targets, outputs)})
+
+    async def revise_stream_async(self, resume, draft, jd, company, title, context, use_cache=True, admit=None):
+        """Streaming `revise_async`; `admit` is held around each LLM call in the same way."""
+        admit = admit or contextlib.nullcontext
+        planned = self.plan(resume, draft, jd, company, title, context)
+        if planned is None:
+            async with admit():
+                async for partial in self.generate_stream_async(jd, company, title, context, use_cache):
+                    yield partial
+            return
+        sections, targets = planned
+        if not targets:
+            yield resume
+            return
+        async with admit():
+            analysis=await self.jd_analysis.analyze_async(jd, use_cache)
+        parts = {}
+        updates = asyncio.Queue()
+
+        async def run(section):
+            try:
+                prompt = self.format_section_prompt(section, jd, company, title, context, analysis)
+                async with admit():
+                    async for partial in self.llm.generate_async(prompt, self.config['model'], use_cache=use_cache,
+                                                                 prompt_key=f"{self.name}.section", stream=True):
+                        parts[section.index] = clean(partial, section)
+                        updates.put_nowait(True)
+            finally:
+                updates.put_nowait(False)
+
+        # Affected sections stream concurrently into one document, as far as `admit` lets them
+        tasks = [asyncio.ensure_future(run(s)) for s in targets]
+        try:
+            remaining = len(tasks)
+            while remaining:
+                if await updates.get():
+                    yield merge(sections, parts)
+                    continue
+                remaining -= 1
+                for task in tasks:
+                    if task.done() and not task.cancelled() and task.exception() is not None:
+                        raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def plan(self, resume, draft, jd, company, title, context):
+        """`(sections, targets)` to regenerate, or None for a full regeneration."""
+        if self.section_template is None:
+            return None
+        return plan(resume, draft, jd, company, title, context, self.get_resume(),
+                    float(self.incremental.get('maxShare', 0.6)))
+
+    def draft(self, jd, company, title, context):
+        """Record the inputs of a generated resume so the next `revise` can compare against them."""
+        return Draft(jd, company, title, context, self.get_resume())
+
+    def generate_section(self, section, jd, company, title, context, analysis, use_cache=True):
+        prompt = self.format_section_prompt(section, jd, company, title, context, analysis)
+        output = self.llm.generate(prompt, self.config['model'], use_cache=use_cache, prompt_key=f"{self.name}.section")
+        return clean(output, section)
+
+    async def generate_section_async(self, section, jd, company, title, context, analysis, use_cache=True):
+        prompt = self.format_section_prompt(section, jd, company, title, context, analysis)
+        output = await self.llm.generate_async(prompt, self.config['model'], use_cache=use_cache, prompt_key=f"{self.name}.section")
+        return clean(output, section)
+
+    def format_section_prompt(self, section, jd, company, title, context, analysis):
+        return self.section_template(
+            job_title=title,
+            company=company,
+            job_description=self.budget.fit('job_description', jd),
+            context=self.budget.fit('context', context),
+            skill_text=analysis,
+            base_section=base_section(section, self.get_resume()),
+            section=section.text)
+
+    def get_prompt(self, jd, company, title, context, use_cache=True):
+        analysis=self.jd_analysis.analyze(jd, use_cache)
+        return self.format_prompt(jd, company, title, context, analysis)
+
+    async def get_prompt_async(self, jd, company, title, context, use_cache=True):
+        analysis=await self.jd_analysis.analyze_async(jd, use_cache)
+        return self.format_prompt(jd, company, title, context, analysis)
+
+    def format_prompt(self, jd, company, title, context, analysis):
+        return self.template(
             job_title=title,
-            company=company, 
-            job_description=jd, 
-            base_resume=self.base_resume, 
-            context=context,
+            company=company,
+            job_description=self.budget.fit('job_description', jd),
+            base_resume=self.budget.fit('base_resume', self.get_resume(), prefix_query(self.llm, jd)),
+            context=self.budget.fit('context', context),
             skill_text=analysis)
-        return self.llm.generate(prompt, model)
-    
+
     def get_fields(self):
         return self.config['input']
 
     def get_resume(self):
-        return self.base_resume
+        return registry.get(self.get_fields()['baseResume'])
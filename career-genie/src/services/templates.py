@@ -0,0 +1,139 @@
+import re
+import string
+import threading
+import time
+from pathlib import Path
+
+from .utils import read
+
+
+class Template:
+    def __init__(self, source):
+        self.source = source
+        self.path = Path(source[7:]) if source.startswith('file://') else None
+        self.text = None
+        self.mtime = None
+        self.checked_at = 0.0
+        self.fields = set()
+        self.expected = []
+
+    def load(self):
+        self.mtime = self.path.stat().st_mtime if self.path else None
+        self.text = read(self.source)
+        try:
+            self.fields = placeholders(self.text)
+        except ValueError:
+            # Plain input files (e.g. the base resume) need not be valid format strings
+            self.fields = None
+        self.checked_at = time.monotonic()
+
+
+class TemplateRegistry:
+    """
+    Loads prompt templates and input files once and serves them from memory.
+
+    `file://` sources are re-read only when their modification time changes,
+    checked at most every `check_interval` seconds. Services bind formatters
+    with the names they pass in so a template asking for an unknown
+    placeholder fails at startup rather than as a KeyError mid-request.
+    """
+
+    def __init__(self, check_interval=2.0):
+        self.check_interval = check_interval
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def load_config(self, config):
+        """Preload every `file://` source referenced anywhere in the config."""
+        for value in _walk(config):
+            if isinstance(value, str) and value.startswith('file://'):
+                self._template(value)
+
+    def get(self, source):
+        """Return the current text of a template, reloading it if the file changed."""
+        template = self._template(source)
+        if template.path is not None and time.monotonic() - template.checked_at >= self.check_interval:
+            self._refresh(template)
+        return template.text
+
+    def validate(self, source, fields):
+        """Raise ValueError if the template uses placeholders outside `fields`."""
+        template = self._template(source)
+        if template.fields is None:
+            raise ValueError(f"Template {_label(source)} is not a valid format string")
+        unknown = template.fields - set(fields)
+        if unknown:
+            raise ValueError(
+                f"Template {_label(source)} uses unknown placeholders {sorted(unknown)}; "
+                f"expected a subset of {sorted(fields)}"
+            )
+
+    def formatter(self, source, fields):
+        """Validate a template against `fields` and return a callable formatting it with keyword arguments."""
+        fields = set(fields)
+        self.validate(source, fields)
+        with self._lock:
+            self._templates[source].expected.append(fields)
+        return lambda **kwargs: self.get(source).format(**kwargs)
+
+    def _template(self, source):
+        with self._lock:
+            template = self._templates.get(source)
+            if template is None:
+                template = Template(source)
+                template.load()
+                self._templates[source] = template
+            return template
+
+    def _refresh(self, template):
+        with self._lock:
+            template.checked_at = time.monotonic()
+            try:
+                mtime = template.path.stat().st_mtime
+            except OSError as e:
+                print(f"Failed to check template {template.path}: {e}")
+                return
+            if mtime == template.mtime:
+                return
+
+            previous = (template.text, template.mtime, template.fields)
+            template.load()
+            for fields in template.expected:
+                unknown = template.fields - fields if template.fields is not None else {"<invalid format string>"}
+                if unknown:
+                    # Keep serving the last valid version until the file is fixed
+                    print(f"Template {template.path} uses unknown placeholders {sorted(unknown)}; keeping previous version")
+                    template.text, _, template.fields = previous
+                    template.mtime = mtime
+                    return
+            print(f"Reloaded template: {template.path}")
+
+
+def placeholders(text):
+    """Names of the `{placeholders}` used in a format string."""
+    names = set()
+    for _, field_name, _, _ in string.Formatter().parse(text):
+        if field_name is None:
+            continue
+        name = re.split(r"[.\[]", field_name, maxsplit=1)[0]
+        names.add(name or "<positional>")
+    return names
+
+
+def _walk(config):
+    if isinstance(config, dict):
+        for value in config.values():
+            yield from _walk(value)
+    elif isinstance(config, list):
+        for value in config:
+            yield from _walk(value)
+    else:
+        yield config
+
+
+def _label(source):
+    return source if source.startswith('file://') else f"'{source[:40]}...'"
+
+
+# Registry shared by all services
+registry = TemplateRegistry()
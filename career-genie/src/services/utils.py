@@ -1,34 +1,35 @@
 import asyncio
-import pdfkit
-import pypandoc
+import hashlib
+import json
+import os
+import uuid
 from pathlib import Path
 from typing import Tuple
 
+from .export_store import ExportStore
+
 export_config = None
+export_store = None
+pdf_backend = None
+_pending_exports = {}
 
-def cleanup(folder_path, extensions=[".md", ".docx", ".pdf"]):
-    folder = Path(folder_path)
-    if not folder.exists() or not folder.is_dir():
-        print(f"Folder {folder_path} does not exist or is not a directory.")
-        return
-
-    for ext in extensions:
-        for file in folder.glob(f"*{ext}"):
-            try:
-                file.unlink()  # deletes the file
-                print(f"Deleted: {file}")
-            except Exception as e:
-                print(f"Failed to delete {file}: {e}")
-
-async def markdown_to_docx_and_pdf(md_text: str, name: str, role: str = "", export_type: str = "resume") -> Tuple[str, str]:
+async def markdown_to_docx_and_pdf(md_text: str, name: str, role: str = "", export_type: str = "resume",
+                                   session: str = "shared") -> Tuple[str, str]:
     """
     Asynchronously converts Markdown text to both DOCX and PDF using Pandoc.
 
+    Both formats render concurrently from the Markdown passed on stdin, the PDF through
+    the backend selected by `export.pdfBackend`. Rendered files are stored once per hash
+    of the Markdown and the export settings, so exporting unchanged text again (from
+    any session) reuses them without re-rendering, and are linked into a folder of
+    their own for each session.
+
     Args:
         md_text (str): The Markdown content to convert.
         role (str): The role for the output files.
         name (str): The base name for the output files.
         export_type (str): The type of export (e.g., "resume", "cover-letter"). Defaults to "resume".
+        session (str): The UI session (or batch record) the download paths belong to.
 
     Returns:
         Tuple[str, str]: Paths to the generated DOCX and PDF files.
@@ -52,39 +53,70 @@ async def markdown_to_docx_and_pdf(md_text: str, name: str, role: str = "", expo
 
     title = f"{name}-{role}-{export_type}".strip().lower().replace(" ", "-")
 
-    # Save Markdown temporarily (Pandoc can read from a file or string)
-    output_base = f"{export_config['path']}/{title}"
-    md_path = Path(f"{output_base}.md")
-    await asyncio.to_thread(md_path.write_text, md_text, encoding="utf-8")
-
-    # DOCX conversion
-    docx_path = f"{output_base}.docx"
-    await asyncio.to_thread(
-        pypandoc.convert_file,
-        str(md_path),
-        "docx",
-        outputfile=docx_path,
-        extra_args=export_config['args'].get("docx", [])
+    backend = get_pdf_backend()
+    digest = artifact_key(md_text, {"docx": export_config['args'].get("docx", []), "pdf": backend.settings()})
+    docx_blob = export_store.blob(digest, ".docx")
+    pdf_blob = export_store.blob(digest, ".pdf")
+
+    if not export_store.has(docx_blob, pdf_blob):
+        # Identical exports already rendering, from any session, share the same task
+        task = _pending_exports.get(digest)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.gather(
+                _convert(render_docx, md_text, str(docx_blob)),
+                _convert(backend.render, md_text, str(pdf_blob))
+            ))
+            _pending_exports[digest] = task
+            task.add_done_callback(lambda _: _pending_exports.pop(digest, None))
+        await asyncio.shield(task)
+
+    filename = f"{title}-{digest[:16]}"
+    return (
+        export_store.publish(docx_blob, session, f"{filename}.docx"),
+        export_store.publish(pdf_blob, session, f"{filename}.pdf")
     )
 
-    # PDF conversion
-    pdf_path = f"{output_base}.pdf"
-    await asyncio.to_thread(
-        pypandoc.convert_file,
-        str(md_path),
-        "pdf",
-        outputfile=pdf_path,
-        extra_args=export_config['args'].get("pdf", [])
-    )
+def artifact_key(md_text: str, args: dict) -> str:
+    payload = json.dumps({"markdown": md_text, "args": args}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
-    # Optional cleanup of temp Markdown file
-    await asyncio.to_thread(md_path.unlink)
+def render_docx(md_text: str, output_path: str) -> None:
+    import pypandoc
 
-    return docx_path, pdf_path
+    pypandoc.convert_text(
+        md_text,
+        "docx",
+        format="md",
+        outputfile=output_path,
+        extra_args=export_config['args'].get("docx", [])
+    )
 
-def set_export_config(config: dict) -> None:
-    global export_config
+async def _convert(render, md_text: str, output_path: str) -> None:
+    # Render to a temporary name first so a half-written file is never served
+    target = Path(output_path)
+    partial = target.with_name(f".{target.stem}.{uuid.uuid4().hex}{target.suffix}")
+    try:
+        await asyncio.to_thread(render, md_text, str(partial))
+        await asyncio.to_thread(os.replace, partial, target)
+        export_store.added(target.stat().st_size)
+    finally:
+        partial.unlink(missing_ok=True)
+
+def set_export_config(config: dict) -> ExportStore:
+    global export_config, export_store, pdf_backend
     export_config = config
+    export_store = ExportStore(config['path'], config.get('store'))
+    pdf_backend = None
+    return export_store
+
+def get_pdf_backend():
+    """The PDF backend for `export_config`, created (with pandoc/pdfkit imports) on the first export."""
+    global pdf_backend
+    if pdf_backend is None:
+        from .pdf_backends import create_backend
+
+        pdf_backend = create_backend(export_config)
+    return pdf_backend
 
 def read(source):
     if not isinstance(source, str):
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+from services.jd_analysis import JdAnalysis
+
+JD = "Senior Backend Engineer. Python, Kafka, AWS."
+CONFIG = {'prompt': "Analyze: {job_description}", 'model': "test-model"}
+
+
+class FakeLLM:
+    """Answers after `release` is set, counting the calls that reach it."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def generate_async(self, prompt, model, use_cache=True, prompt_key=None):
+        self.calls += 1
+        await self.release.wait()
+        return f"analysis {self.calls}"
+
+
+def test_cancelled_waiter_does_not_break_owner():
+    async def run():
+        llm = FakeLLM()
+        analysis = JdAnalysis(CONFIG, llm)
+        owner = asyncio.create_task(analysis.analyze_async(JD))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(analysis.analyze_async(JD))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        llm.release.set()
+
+        assert await owner == "analysis 1"
+        assert await analysis.analyze_async(JD) == "analysis 1"
+        assert llm.calls == 1
+
+    asyncio.run(run())
+
+
+def test_waiter_starts_over_when_owner_is_cancelled():
+    async def run():
+        llm = FakeLLM()
+        analysis = JdAnalysis(CONFIG, llm)
+        owner = asyncio.create_task(analysis.analyze_async(JD))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(analysis.analyze_async(JD))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        await asyncio.gather(owner, return_exceptions=True)
+        llm.release.set()
+
+        assert await waiter == "analysis 2"
+
+    asyncio.run(run())
+
+
+def test_sync_waiter_starts_over_when_owner_is_interrupted():
+    started, proceed = threading.Event(), threading.Event()
+
+    class InterruptedLLM:
+        calls = 0
+
+        def generate(self, prompt, model, use_cache=True, prompt_key=None):
+            self.calls += 1
+            if self.calls == 1:
+                started.set()
+                proceed.wait(5)
+                raise KeyboardInterrupt
+            return "analysis 2"
+
+    analysis = JdAnalysis(CONFIG, InterruptedLLM())
+    results = []
+
+    def owner():
+        try:
+            analysis.analyze(JD)
+        except KeyboardInterrupt:
+            results.append("interrupted")
+
+    owner_thread = threading.Thread(target=owner)
+    owner_thread.start()
+    started.wait(5)
+    waiter_thread = threading.Thread(target=lambda: results.append(analysis.analyze(JD)))
+    waiter_thread.start()
+    proceed.set()
+    owner_thread.join(5)
+    waiter_thread.join(5)
+
+    assert sorted(results) == ["analysis 2", "interrupted"]
@@ -1,20 +1,20 @@
+from collections.abc import AsyncIterator
+
 from agents.base_agent import BaseAgent, AgentResult
 
 
 class AnalystAgent(BaseAgent):
-    async def invoke(self, topic: str, session_id: str) -> AgentResult:
+    async def stream(self, topic: str, session_id: str) -> AsyncIterator[AgentResult]:
         try:
-            responses = self.memory.get_session_responses(session_id)
+            responses = await self.memory.get_session_responses_async(session_id)
 
             if not responses:
-                return AgentResult(
-                    agent_id=self.agent_id,
-                    agent_name=self.agent_name,
-                    model=self.model,
-                    response_text="No research responses available to analyze.",
-                    session_id=session_id,
+                yield self.result(
+                    session_id,
+                    "No research responses available to analyze.",
                     error="No responses found in session",
                 )
+                return
 
             context_parts = []
             for resp in responses:
@@ -30,31 +30,21 @@ class AnalystAgent(BaseAgent):
                 f"Please evaluate these responses and provide your synthesis."
             )
 
-            response_text = await self.provider.chat_completion(
+            response_text = ""
+            async for chunk in self.provider.stream_chat_completion(
                 agent_id=self.agent_id,
                 user_message=user_message,
-            )
+                agent_config=self.config,
+            ):
+                response_text += chunk
+                yield self.result(session_id, response_text, done=False)
 
-            self.memory.save_analyst_evaluation(
+            await self.memory.save_analyst_evaluation_async(
                 session_id=session_id,
                 recommendation=response_text,
             )
-            self.memory.complete_session(session_id)
+            await self.memory.complete_session_async(session_id)
 
-            return AgentResult(
-                agent_id=self.agent_id,
-                agent_name=self.agent_name,
-                model=self.model,
-                response_text=response_text,
-                session_id=session_id,
-            )
+            yield self.result(session_id, response_text)
         except Exception as exc:
-            error_msg = f"Analyst error: {exc}"
-            return AgentResult(
-                agent_id=self.agent_id,
-                agent_name=self.agent_name,
-                model=self.model,
-                response_text="",
-                session_id=session_id,
-                error=error_msg,
-            )
+            yield self.result(session_id, error=f"Analyst error: {exc}")
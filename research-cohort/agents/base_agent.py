@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -12,6 +13,7 @@ class AgentResult:
     session_id: str
     timestamp: str = field(default_factory=lambda: datetime.utcnow().isoformat())
     error: str = ""
+    done: bool = True
 
     @property
     def success(self) -> bool:
@@ -19,14 +21,33 @@ class AgentResult:
 
 
 class BaseAgent(ABC):
-    def __init__(self, agent_id: str, provider, memory):
+    def __init__(self, agent_id: str, provider, memory, config: dict | None = None):
         self.agent_id = agent_id
         self.provider = provider
         self.memory = memory
-        cfg = provider.get_agent_config(agent_id)
-        self.agent_name: str = cfg["name"]
-        self.model: str = cfg["model"]
+        # Resolved once: a config reload builds new agents rather than changing this one
+        self.config: dict = config or provider.resolve(agent_id)
+        self.agent_name: str = self.config["name"]
+        self.model: str = self.config["model"]
+
+    def result(self, session_id: str, response_text: str = "", error: str = "", done: bool = True) -> AgentResult:
+        return AgentResult(
+            agent_id=self.agent_id,
+            agent_name=self.agent_name,
+            model=self.model,
+            response_text=response_text,
+            session_id=session_id,
+            error=error,
+            done=done,
+        )
 
     @abstractmethod
+    def stream(self, topic: str, session_id: str) -> AsyncIterator[AgentResult]:
+        """Run the agent on a topic, yielding partial results (done=False) as tokens arrive and the final result last."""
+
     async def invoke(self, topic: str, session_id: str) -> AgentResult:
-        """Run the agent on a topic and return a result."""
+        """Run the agent on a topic and return the final result."""
+        result = None
+        async for result in self.stream(topic, session_id):
+            pass
+        return result
@@ -0,0 +1,89 @@
+import asyncio
+from dataclasses import dataclass
+
+from agents.analyst_agent import AnalystAgent
+from agents.research_agent import ResearchAgent
+from providers.llm_provider import LLMProvider
+from tools.shared_memory import SharedMemory
+
+
+@dataclass(frozen=True)
+class Agents:
+    """The agents of one configuration; a run keeps the set it started with."""
+    researchers: tuple[ResearchAgent, ...]
+    analyst: AnalystAgent
+
+    @property
+    def names(self) -> list[str]:
+        return [agent.agent_name for agent in self.researchers]
+
+
+def agent_ids(provider: LLMProvider) -> tuple[list[str], str]:
+    """The research agent ids, in config order, and the analyst's id; raises ValueError for an unusable config."""
+    research_ids = provider.agent_ids("research")
+    analyst_ids = provider.agent_ids("analyst")
+    if not research_ids:
+        raise ValueError("config.json defines no research agents")
+    if len(analyst_ids) != 1:
+        raise ValueError(f"config.json must define exactly one agent with \"role\": \"analyst\", found {len(analyst_ids)}")
+    return research_ids, analyst_ids[0]
+
+
+class Cohort:
+    """The provider, shared memory and agents of the app, built once per process.
+
+    Every research session shares them: the provider's HTTP connection pools
+    and concurrency limits, the memory's writer and reader threads, and the
+    agents, which keep no state between calls. The research agents are every
+    agent in config.json without `"role": "analyst"`, in config order.
+    `reload()` re-reads config.json on demand; runs in progress keep the
+    agents, and so the models and prompts, they started with.
+    """
+
+    def __init__(self, config_path: str | None = None, db_path: str | None = None):
+        self.provider = LLMProvider(config_path)
+        self.memory = SharedMemory(db_path)
+        self.agents = self._build()
+
+    def _build(self, source: LLMProvider | None = None) -> Agents:
+        """Agents using this cohort's provider and memory, with their settings resolved from `source`'s config."""
+        source = source or self.provider
+        research_ids, analyst_id = agent_ids(source)
+        return Agents(
+            researchers=tuple(
+                ResearchAgent(agent_id, self.provider, self.memory, source.resolve(agent_id))
+                for agent_id in research_ids
+            ),
+            analyst=AnalystAgent(analyst_id, self.provider, self.memory, source.resolve(analyst_id)),
+        )
+
+    async def reload(self) -> Agents:
+        """Re-read config.json and rebuild the agents; call from the event loop.
+
+        The new agents are built in full from a staged copy of the config
+        before the provider switches to it, so a config that is invalid or
+        incomplete raises and leaves the cohort as it was. The UI has one
+        panel per research agent, so their number cannot change until
+        restart; a config that changes it raises ValueError.
+        """
+        staged = LLMProvider(self.provider.config_path)
+        agents = self._build(staged)
+        if len(agents.researchers) != len(self.agents.researchers):
+            raise ValueError(
+                f"config.json now defines {len(agents.researchers)} research agents instead of "
+                f"{len(self.agents.researchers)}; restart the app to change the number of agents"
+            )
+        await self.provider.reload(staged.config)
+        self.agents = agents
+        return self.agents
+
+    def close(self, timeout: float = 10):
+        """Close the HTTP pools, then flush and close the shared memory; call from outside the event loop.
+
+        The pools are closed on the event loop that used them, so call this
+        before that loop stops; once it has, they are released with the process.
+        """
+        loop = self.provider.loop
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(self.provider.aclose(), loop).result(timeout)
+        self.memory.close()
@@ -1,34 +1,27 @@
+from collections.abc import AsyncIterator
+
 from agents.base_agent import BaseAgent, AgentResult
 
 
 class ResearchAgent(BaseAgent):
-    async def invoke(self, topic: str, session_id: str) -> AgentResult:
+    async def stream(self, topic: str, session_id: str) -> AsyncIterator[AgentResult]:
         try:
-            response_text = await self.provider.chat_completion(
+            response_text = ""
+            async for chunk in self.provider.stream_chat_completion(
                 agent_id=self.agent_id,
                 user_message=f"Research the following topic thoroughly: {topic}",
-            )
-            self.memory.save_agent_response(
+                agent_config=self.config,
+            ):
+                response_text += chunk
+                yield self.result(session_id, response_text, done=False)
+
+            await self.memory.save_agent_response_async(
                 session_id=session_id,
                 agent_id=self.agent_id,
                 agent_name=self.agent_name,
                 model=self.model,
                 response_text=response_text,
             )
-            return AgentResult(
-                agent_id=self.agent_id,
-                agent_name=self.agent_name,
-                model=self.model,
-                response_text=response_text,
-                session_id=session_id,
-            )
+            yield self.result(session_id, response_text)
         except Exception as exc:
-            error_msg = f"Error from {self.agent_name}: {exc}"
-            return AgentResult(
-                agent_id=self.agent_id,
-                agent_name=self.agent_name,
-                model=self.model,
-                response_text="",
-                session_id=session_id,
-                error=error_msg,
-            )
+            yield self.result(session_id, error=f"Error from {self.agent_name}: {exc}")
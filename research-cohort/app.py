@@ -1,6 +1,6 @@
 import asyncio
-import os
-import sys
+import threading
+from functools import partial
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -8,45 +8,70 @@ from dotenv import load_dotenv
 # Load .env from project root
 load_dotenv(Path(__file__).parent / ".env")
 
-from agents.analyst_agent import AnalystAgent
-from agents.research_agent import ResearchAgent
-from providers.llm_provider import LLMProvider
-from tools.shared_memory import SharedMemory
+from agents.cohort import Cohort
 from ui.layout import create_ui
 
 
-def build_agents():
-    provider = LLMProvider()
-    memory = SharedMemory()
-    agent1 = ResearchAgent("research_agent_1", provider, memory)
-    agent2 = ResearchAgent("research_agent_2", provider, memory)
-    agent3 = ResearchAgent("research_agent_3", provider, memory)
-    analyst = AnalystAgent("analyst_agent", provider, memory)
-    return memory, agent1, agent2, agent3, analyst
+async def run_research(cohort: Cohort, topic: str):
+    """Yield (panel index, AgentResult) as the agents stream: the N research agents
+    interleaved as their tokens arrive, then the analyst (panel N) once they finish."""
+    # A config reload during the run does not change the agents it started with
+    agents = cohort.agents
+    session_id = await cohort.memory.create_session_async(topic)
+    researchers = agents.researchers
 
+    # Run all research agents concurrently, merging their streams; the provider
+    # limits how many of them are in flight per provider
+    updates: asyncio.Queue = asyncio.Queue()
 
-async def run_research(topic: str):
-    memory, agent1, agent2, agent3, analyst = build_agents()
-    session_id = memory.create_session(topic)
+    async def pump(index, agent):
+        try:
+            async for result in agent.stream(topic, session_id):
+                updates.put_nowait((index, result))
+        finally:
+            updates.put_nowait(None)
 
-    # Run all 3 research agents concurrently
-    results = await asyncio.gather(
-        agent1.invoke(topic, session_id),
-        agent2.invoke(topic, session_id),
-        agent3.invoke(topic, session_id),
-        return_exceptions=False,
-    )
+    tasks = [asyncio.create_task(pump(i, agent)) for i, agent in enumerate(researchers)]
+    try:
+        running = len(tasks)
+        while running:
+            update = await updates.get()
+            if update is None:
+                running -= 1
+            else:
+                yield update
+    finally:
+        # Stops the remaining agents if the client goes away mid-stream
+        for task in tasks:
+            task.cancel()
+
+    # Analyst synthesizes after all research agents complete
+    async for result in agents.analyst.stream(topic, session_id):
+        yield len(researchers), result
 
-    # Analyst synthesizes after all 3 complete
-    analyst_result = await analyst.invoke(topic, session_id)
 
-    return results[0], results[1], results[2], analyst_result
+async def reload_agents(cohort: Cohort) -> list[str]:
+    return (await cohort.reload()).names
 
 
 def main():
-    demo = create_ui(run_research)
+    # Built once and shared by every session
+    cohort = Cohort()
+    demo = create_ui(
+        partial(run_research, cohort),
+        cohort.agents.names,
+        reload_fn=partial(reload_agents, cohort),
+    )
     demo.queue()
-    demo.launch(server_name="0.0.0.0", server_port=7860, share=False)
+    demo.launch(server_name="0.0.0.0", server_port=7860, share=False, prevent_thread_lock=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # While the server's event loop still runs, so the HTTP pools can be closed on it
+        cohort.close()
+        demo.close()
 
 
 if __name__ == "__main__":
@@ -1,33 +1,146 @@
+import asyncio
 import json
 import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from pathlib import Path
 
+import httpx
 from openai import AsyncOpenAI
 
 
 CONFIG_PATH = Path(__file__).parent.parent / "config.json"
 
+# Connection pool settings, overridden by the top-level and then the per-provider "http" config
+HTTP_DEFAULTS = {
+    "max_connections": 20,
+    "max_keepalive_connections": 20,
+    "keepalive_expiry": 60,
+    "timeout": 120,
+}
+
+# Requests a provider may have in flight at once, unless its config sets "max_concurrency"
+DEFAULT_MAX_CONCURRENCY = 4
+
 
 class LLMProvider:
+    """Config-driven OpenAI-compatible clients, one per provider.
+
+    Each client owns a pooled `httpx.AsyncClient` that is kept for the life of
+    the provider, so requests reuse keep-alive connections and TLS sessions.
+    Requests beyond a provider's `max_concurrency` wait for a slot, shared by
+    all sessions, so a wide cohort does not trip the provider's rate limit.
+    `reload()` re-reads the config on demand; clients whose provider settings
+    did not change are kept, the others are closed once their requests finish.
+    Requests use the agent settings passed in (see `resolve()`), so agents
+    built before a reload keep theirs. Use from one event loop (`loop`).
+    """
+
     def __init__(self, config_path: str | None = None):
-        with open(config_path or CONFIG_PATH) as f:
-            self._config = json.load(f)
-        self._clients: dict[str, AsyncOpenAI] = {}
-
-    def _get_client(self, provider_name: str) -> AsyncOpenAI:
-        if provider_name not in self._clients:
-            provider_cfg = self._config["providers"][provider_name]
-            api_key = os.environ.get(provider_cfg["env_key"])
+        self.config_path = config_path or CONFIG_PATH
+        self._config = self._load()
+        # Keyed by endpoint (see `_endpoint()`), so agents resolved before a reload keep their own client
+        self._clients: dict[tuple, AsyncOpenAI] = {}
+        self._leases: dict[tuple, int] = {}
+        self._limits: dict[str, tuple[int, asyncio.Semaphore]] = {}
+        self._current = self._endpoints()
+        # The event loop the clients were created on; they must be closed there
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def _load(self) -> dict:
+        with open(self.config_path) as f:
+            return json.load(f)
+
+    def _endpoint(self, provider_name: str) -> tuple:
+        provider_cfg = self._config["providers"][provider_name]
+        http = {**HTTP_DEFAULTS, **self._config.get("http", {}), **provider_cfg.get("http", {})}
+        return provider_name, provider_cfg["base_url"], provider_cfg["env_key"], tuple(sorted(http.items()))
+
+    def _endpoints(self) -> set[tuple]:
+        endpoints = set()
+        for provider_name in self._config.get("providers", {}):
+            try:
+                endpoints.add(self._endpoint(provider_name))
+            except KeyError:
+                pass
+        return endpoints
+
+    def _get_client(self, endpoint: tuple) -> AsyncOpenAI:
+        if endpoint not in self._clients:
+            provider_name, base_url, env_key, http = endpoint
+            api_key = os.environ.get(env_key)
             if not api_key:
                 raise ValueError(
-                    f"Missing environment variable '{provider_cfg['env_key']}' "
+                    f"Missing environment variable '{env_key}' "
                     f"for provider '{provider_name}'"
                 )
-            self._clients[provider_name] = AsyncOpenAI(
-                api_key=api_key,
-                base_url=provider_cfg["base_url"],
+            http = dict(http)
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=http["max_connections"],
+                    max_keepalive_connections=http["max_keepalive_connections"],
+                    keepalive_expiry=http["keepalive_expiry"],
+                ),
+                timeout=httpx.Timeout(http["timeout"], connect=10),
             )
-        return self._clients[provider_name]
+            self._clients[endpoint] = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+            self.loop = asyncio.get_running_loop()
+        return self._clients[endpoint]
+
+    @asynccontextmanager
+    async def _lease(self, endpoint: tuple) -> AsyncIterator[AsyncOpenAI]:
+        client = self._get_client(endpoint)
+        self._leases[endpoint] = self._leases.get(endpoint, 0) + 1
+        try:
+            yield client
+        finally:
+            self._leases[endpoint] -= 1
+            if not self._leases[endpoint]:
+                del self._leases[endpoint]
+                # Last request on a client a reload replaced
+                if endpoint not in self._current:
+                    await self._close(endpoint)
+
+    async def _close(self, endpoint: tuple):
+        client = self._clients.pop(endpoint, None)
+        if client is not None:
+            await client.close()
+
+    def _limit(self, provider_name: str) -> asyncio.Semaphore:
+        provider_cfg = self._config.get("providers", {}).get(provider_name, {})
+        limit = provider_cfg.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)
+        if self._limits.get(provider_name, (None,))[0] != limit:
+            # New or changed on reload: requests holding the old semaphore release it as they finish
+            self._limits[provider_name] = (limit, asyncio.Semaphore(limit))
+        return self._limits[provider_name][1]
+
+    @property
+    def config(self) -> dict:
+        return self._config
+
+    async def reload(self, config: dict | None = None):
+        """Switch to `config` (default: re-read the file), replacing only the clients of providers whose settings changed.
+
+        A replaced client is closed now if idle, otherwise when its last request finishes.
+        """
+        self._config = config if config is not None else self._load()
+        self._current = self._endpoints()
+        for endpoint in list(self._clients):
+            if endpoint not in self._current and endpoint not in self._leases:
+                await self._close(endpoint)
+
+    async def aclose(self):
+        """Close every client; call on `loop`."""
+        for endpoint in list(self._clients):
+            await self._close(endpoint)
+
+    def agent_ids(self, role: str = "research") -> list[str]:
+        """Ids of the configured agents with `role` ("research" unless set), in config order."""
+        return [
+            agent_id
+            for agent_id, agent_cfg in self._config.get("agents", {}).items()
+            if agent_cfg.get("role", "research") == role
+        ]
 
     def get_agent_config(self, agent_id: str) -> dict:
         agents = self._config.get("agents", {})
@@ -35,20 +148,20 @@ class LLMProvider:
             raise ValueError(f"Agent '{agent_id}' not found in config")
         return agents[agent_id]
 
-    async def chat_completion(
-        self,
-        agent_id: str,
-        user_message: str,
-        extra_system: str = "",
-    ) -> str:
-        agent_cfg = self.get_agent_config(agent_id)
-        client = self._get_client(agent_cfg["provider"])
+    def resolve(self, agent_id: str) -> dict:
+        """A copy of the agent's config with its provider's endpoint, unaffected by later reloads."""
+        agent_cfg = dict(self.get_agent_config(agent_id))
+        agent_cfg["endpoint"] = self._endpoint(agent_cfg["provider"])
+        return agent_cfg
+
+    def _request(self, agent_cfg: dict, user_message: str, extra_system: str) -> tuple[asyncio.Semaphore, dict]:
+        limit = self._limit(agent_cfg["provider"])
 
         system_prompt = agent_cfg["system_prompt"]
         if extra_system:
             system_prompt = f"{system_prompt}\n\n{extra_system}"
 
-        response = await client.chat.completions.create(
+        return limit, dict(
             model=agent_cfg["model"],
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -57,4 +170,38 @@ class LLMProvider:
             temperature=agent_cfg.get("temperature", 0.7),
             max_tokens=agent_cfg.get("max_tokens", 1500),
         )
+
+    async def chat_completion(
+        self,
+        agent_id: str,
+        user_message: str,
+        extra_system: str = "",
+        agent_config: dict | None = None,
+    ) -> str:
+        """`agent_config` is the agent's `resolve()`d settings; defaults to its current config."""
+        agent_cfg = agent_config or self.resolve(agent_id)
+        limit, request = self._request(agent_cfg, user_message, extra_system)
+        async with limit, self._lease(agent_cfg["endpoint"]) as client:
+            response = await client.chat.completions.create(**request)
         return response.choices[0].message.content or ""
+
+    async def stream_chat_completion(
+        self,
+        agent_id: str,
+        user_message: str,
+        extra_system: str = "",
+        agent_config: dict | None = None,
+    ) -> AsyncIterator[str]:
+        """Yield the response text in chunks as the provider streams it."""
+        agent_cfg = agent_config or self.resolve(agent_id)
+        limit, request = self._request(agent_cfg, user_message, extra_system)
+        # The slot is held until the stream ends: a streaming request is in flight throughout
+        async with limit, self._lease(agent_cfg["endpoint"]) as client:
+            stream = await client.chat.completions.create(**request, stream=True)
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Closing early (e.g. the user left) releases the HTTP connection
+                await stream.close()
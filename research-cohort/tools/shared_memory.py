@@ -1,92 +1,273 @@
+import asyncio
+import queue
 import sqlite3
+import threading
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
 
 DB_PATH = Path(__file__).parent.parent / "research.db"
 
+PRAGMAS = (
+    # Readers no longer block the writer (or each other) and vice versa
+    "PRAGMA journal_mode=WAL",
+    # Durable at checkpoints; a crash can only lose the last few commits, never corrupt
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS research_sessions (
+        id TEXT PRIMARY KEY,
+        topic TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'in_progress'
+    );
+
+    CREATE TABLE IF NOT EXISTS agent_responses (
+        id TEXT PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        agent_id TEXT NOT NULL,
+        agent_name TEXT NOT NULL,
+        model TEXT NOT NULL,
+        response_text TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (session_id) REFERENCES research_sessions(id)
+    );
+
+    CREATE TABLE IF NOT EXISTS analyst_evaluations (
+        id TEXT PRIMARY KEY,
+        session_id TEXT NOT NULL,
+        recommendation TEXT NOT NULL,
+        reasoning TEXT,
+        best_agent_id TEXT,
+        created_at TEXT NOT NULL,
+        FOREIGN KEY (session_id) REFERENCES research_sessions(id)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_agent_responses_session
+        ON agent_responses (session_id, created_at);
+
+    CREATE INDEX IF NOT EXISTS idx_analyst_evaluations_session
+        ON analyst_evaluations (session_id);
+"""
+
 
 class SharedMemory:
-    def __init__(self, db_path: str | None = None):
+    """SQLite store shared by the agents of all research sessions.
+
+    All writes go through one writer thread owning a persistent connection.
+    Writes queued while a transaction commits are applied together in the next
+    one (up to `max_batch`), so concurrent agents share commits instead of
+    contending for the database lock. Reads use persistent per-thread
+    connections, which WAL lets run alongside the writer. Every method has an
+    `_async` twin that waits on those threads without blocking the event loop.
+    """
+
+    def __init__(self, db_path: str | None = None, readers: int = 2, max_batch: int = 64):
         self.db_path = str(db_path or DB_PATH)
-        self._init_db()
+        self.max_batch = max_batch
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writes: queue.SimpleQueue = queue.SimpleQueue()
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="shared-memory-reader")
+
+        ready: Future = Future()
+        self._writer = threading.Thread(
+            target=self._write_loop, args=(ready,), name="shared-memory-writer", daemon=True
+        )
+        self._writer.start()
+        # Surfaces an unopenable database or failing DDL here rather than on the first write
+        ready.result()
 
     def _get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Autocommit: the writer manages its transactions and reads see the latest commit.
+            # check_same_thread is off only so close() can close every thread's connection.
+            conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
         return conn
 
-    def _init_db(self):
-        with self._get_conn() as conn:
-            conn.executescript("""
-                CREATE TABLE IF NOT EXISTS research_sessions (
-                    id TEXT PRIMARY KEY,
-                    topic TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    status TEXT NOT NULL DEFAULT 'in_progress'
-                );
-
-                CREATE TABLE IF NOT EXISTS agent_responses (
-                    id TEXT PRIMARY KEY,
-                    session_id TEXT NOT NULL,
-                    agent_id TEXT NOT NULL,
-                    agent_name TEXT NOT NULL,
-                    model TEXT NOT NULL,
-                    response_text TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (session_id) REFERENCES research_sessions(id)
-                );
-
-                CREATE TABLE IF NOT EXISTS analyst_evaluations (
-                    id TEXT PRIMARY KEY,
-                    session_id TEXT NOT NULL,
-                    recommendation TEXT NOT NULL,
-                    reasoning TEXT,
-                    best_agent_id TEXT,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (session_id) REFERENCES research_sessions(id)
-                );
-            """)
+    def _init_db(self, conn: sqlite3.Connection):
+        conn.executescript(SCHEMA)
 
-    def create_session(self, topic: str) -> str:
+    def _write_loop(self, ready: Future):
+        try:
+            conn = self._get_conn()
+            self._init_db(conn)
+        except Exception as exc:
+            ready.set_exception(exc)
+            return
+        ready.set_result(None)
+
+        closing = False
+        while not closing:
+            batch = []
+            item = self._writes.get()
+            while item is not None:
+                op, future = item
+                # A write whose waiter was cancelled before it started is dropped
+                if future.set_running_or_notify_cancel():
+                    batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+            closing = item is None
+            if batch:
+                self._commit(conn, batch)
+
+        # Writes submitted while closing
+        while True:
+            try:
+                item = self._writes.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("SharedMemory is closed"))
+
+    def _commit(self, conn: sqlite3.Connection, batch: list):
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for op, future in batch:
+                # A failed statement is rolled back on its own; the rest of the batch still commits
+                try:
+                    outcomes.append((future, op(conn), None))
+                except Exception as exc:
+                    outcomes.append((future, None, exc))
+            conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for future, result, exc in outcomes:
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
+
+    def _submit(self, op) -> Future:
+        if not self._writer.is_alive():
+            raise RuntimeError("SharedMemory is closed")
+        future: Future = Future()
+        self._writes.put((op, future))
+        return future
+
+    def _write(self, op):
+        return self._submit(op).result()
+
+    async def _write_async(self, op):
+        return await asyncio.wrap_future(self._submit(op))
+
+    def _read(self, op):
+        return op(self._get_conn())
+
+    async def _read_async(self, op):
+        return await asyncio.wrap_future(self._readers.submit(self._read, op))
+
+    def close(self):
+        """Apply the writes already queued, stop the threads and close all connections."""
+        if self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join()
+        self._readers.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    def _create_session(self, topic: str):
         session_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
-        with self._get_conn() as conn:
+
+        def op(conn):
             conn.execute(
                 "INSERT INTO research_sessions (id, topic, created_at, status) VALUES (?, ?, ?, ?)",
                 (session_id, topic, now, "in_progress"),
             )
-        return session_id
+            return session_id
+        return op
 
-    def complete_session(self, session_id: str):
-        with self._get_conn() as conn:
+    def create_session(self, topic: str) -> str:
+        return self._write(self._create_session(topic))
+
+    async def create_session_async(self, topic: str) -> str:
+        return await self._write_async(self._create_session(topic))
+
+    def _complete_session(self, session_id: str):
+        def op(conn):
             conn.execute(
                 "UPDATE research_sessions SET status = 'completed' WHERE id = ?",
                 (session_id,),
             )
+        return op
 
-    def save_agent_response(
+    def complete_session(self, session_id: str):
+        self._write(self._complete_session(session_id))
+
+    async def complete_session_async(self, session_id: str):
+        await self._write_async(self._complete_session(session_id))
+
+    def _save_agent_response(
         self,
         session_id: str,
         agent_id: str,
         agent_name: str,
         model: str,
         response_text: str,
-    ) -> str:
+    ):
         response_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
-        with self._get_conn() as conn:
+
+        def op(conn):
             conn.execute(
                 """INSERT INTO agent_responses
                    (id, session_id, agent_id, agent_name, model, response_text, created_at)
                    VALUES (?, ?, ?, ?, ?, ?, ?)""",
                 (response_id, session_id, agent_id, agent_name, model, response_text, now),
             )
-        return response_id
+            return response_id
+        return op
 
-    def get_session_responses(self, session_id: str) -> list[dict]:
-        with self._get_conn() as conn:
+    def save_agent_response(
+        self,
+        session_id: str,
+        agent_id: str,
+        agent_name: str,
+        model: str,
+        response_text: str,
+    ) -> str:
+        return self._write(self._save_agent_response(session_id, agent_id, agent_name, model, response_text))
+
+    async def save_agent_response_async(
+        self,
+        session_id: str,
+        agent_id: str,
+        agent_name: str,
+        model: str,
+        response_text: str,
+    ) -> str:
+        return await self._write_async(
+            self._save_agent_response(session_id, agent_id, agent_name, model, response_text)
+        )
+
+    def _get_session_responses(self, session_id: str):
+        def op(conn):
             rows = conn.execute(
                 """SELECT agent_id, agent_name, model, response_text, created_at
                    FROM agent_responses
@@ -94,22 +275,51 @@ class SharedMemory:
                    ORDER BY created_at""",
                 (session_id,),
             ).fetchall()
-        return [dict(row) for row in rows]
+            return [dict(row) for row in rows]
+        return op
 
-    def save_analyst_evaluation(
+    def get_session_responses(self, session_id: str) -> list[dict]:
+        return self._read(self._get_session_responses(session_id))
+
+    async def get_session_responses_async(self, session_id: str) -> list[dict]:
+        return await self._read_async(self._get_session_responses(session_id))
+
+    def _save_analyst_evaluation(
         self,
         session_id: str,
         recommendation: str,
         reasoning: str = "",
         best_agent_id: str = "",
-    ) -> str:
+    ):
         eval_id = str(uuid.uuid4())
         now = datetime.utcnow().isoformat()
-        with self._get_conn() as conn:
+
+        def op(conn):
             conn.execute(
                 """INSERT INTO analyst_evaluations
                    (id, session_id, recommendation, reasoning, best_agent_id, created_at)
                    VALUES (?, ?, ?, ?, ?, ?)""",
                 (eval_id, session_id, recommendation, reasoning, best_agent_id, now),
             )
-        return eval_id
+            return eval_id
+        return op
+
+    def save_analyst_evaluation(
+        self,
+        session_id: str,
+        recommendation: str,
+        reasoning: str = "",
+        best_agent_id: str = "",
+    ) -> str:
+        return self._write(self._save_analyst_evaluation(session_id, recommendation, reasoning, best_agent_id))
+
+    async def save_analyst_evaluation_async(
+        self,
+        session_id: str,
+        recommendation: str,
+        reasoning: str = "",
+        best_agent_id: str = "",
+    ) -> str:
+        return await self._write_async(
+            self._save_analyst_evaluation(session_id, recommendation, reasoning, best_agent_id)
+        )
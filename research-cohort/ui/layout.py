@@ -1,11 +1,19 @@
 import gradio as gr
 
 
-def create_ui(run_research_fn):
+# Research agent panels per row; a wider cohort wraps onto more rows
+PANELS_PER_ROW = 4
+
+
+def create_ui(run_research_fn, agent_names, reload_fn=None):
     """Build and return the Gradio Blocks UI.
 
     Args:
-        run_research_fn: async callable(topic) -> (alpha_md, beta_md, gamma_md, analyst_md)
+        run_research_fn: async generator(topic) yielding (panel index, AgentResult) as the
+            agents stream; panels 0..N-1 are the research agents and N the analyst.
+        agent_names: display names of the N research agents, one panel each.
+        reload_fn: optional async callable() re-reading config.json and returning the research
+            agents' names; adds a "Reload Config" button.
     """
     with gr.Blocks(
         title="Research Cohort",
@@ -16,31 +24,24 @@ def create_ui(run_research_fn):
             #submit-btn { min-width: 120px; }
         """,
     ) as demo:
-        gr.Markdown("# Research Cohort\nEnter a topic below to have 3 research agents investigate it in parallel. An analyst will synthesize their findings.")
-
-        # Row 1: Research agent outputs
-        with gr.Row():
-            with gr.Column(elem_classes=["agent-panel"]):
-                gr.Markdown("### Agent Alpha")
-                alpha_status = gr.Markdown("*Waiting...*")
-                alpha_out = gr.Markdown(elem_classes=["agent-panel"])
-
-            with gr.Column(elem_classes=["agent-panel"]):
-                gr.Markdown("### Agent Beta")
-                beta_status = gr.Markdown("*Waiting...*")
-                beta_out = gr.Markdown(elem_classes=["agent-panel"])
-
-            with gr.Column(elem_classes=["agent-panel"]):
-                gr.Markdown("### Agent Gamma")
-                gamma_status = gr.Markdown("*Waiting...*")
-                gamma_out = gr.Markdown(elem_classes=["agent-panel"])
+        gr.Markdown(f"# Research Cohort\nEnter a topic below to have {len(agent_names)} research agents investigate it in parallel. An analyst will synthesize their findings.")
+
+        # Row 1: Research agent outputs (index i of these lists is panel i)
+        headers, statuses, outs = [], [], []
+        for start in range(0, len(agent_names), PANELS_PER_ROW):
+            with gr.Row():
+                for name in agent_names[start:start + PANELS_PER_ROW]:
+                    with gr.Column(elem_classes=["agent-panel"]):
+                        headers.append(gr.Markdown(f"### {name}"))
+                        statuses.append(gr.Markdown("*Waiting...*"))
+                        outs.append(gr.Markdown(elem_classes=["agent-panel"]))
 
         # Row 2: Analyst synthesis
         with gr.Row():
             with gr.Column(elem_classes=["analyst-panel"]):
                 gr.Markdown("### Analyst Synthesis")
-                analyst_status = gr.Markdown("*Waiting...*")
-                analyst_out = gr.Markdown(elem_classes=["analyst-panel"])
+                statuses.append(gr.Markdown("*Waiting...*"))
+                outs.append(gr.Markdown(elem_classes=["analyst-panel"]))
 
         # Row 3: Input
         with gr.Row():
@@ -50,65 +51,53 @@ def create_ui(run_research_fn):
                 scale=5,
             )
             submit_btn = gr.Button("Research", variant="primary", elem_id="submit-btn", scale=1)
+            if reload_fn is not None:
+                reload_btn = gr.Button("Reload Config", variant="secondary", scale=1)
+        reload_status = gr.Markdown()
 
-        def set_researching():
-            return (
-                "*Researching...*",
-                "*Researching...*",
-                "*Researching...*",
-                "*Researching...*",
-                "", "", "", "",
-            )
+        panels = len(statuses)
+
+        def fmt(result) -> tuple[str, str]:
+            if result.error:
+                return f"*Error: {result.error}*", f"**Model:** `{result.model}`\n\n---\n\n> {result.error}"
+            if not result.done:
+                return f"*Streaming — `{result.model}`...*", result.response_text
+            return f"*Done — `{result.model}`*", result.response_text
 
         async def on_submit(topic):
             if not topic or not topic.strip():
-                yield (
-                    "*Please enter a topic.*",
-                    "*Please enter a topic.*",
-                    "*Please enter a topic.*",
-                    "*Please enter a topic.*",
-                    "", "", "", "",
-                )
+                yield ("*Please enter a topic.*",) * panels + ("",) * panels
                 return
 
             # Show researching status
-            yield (
-                "*Researching...*",
-                "*Researching...*",
-                "*Researching...*",
-                "*Waiting for research agents...*",
-                "", "", "", "",
-            )
+            yield ("*Researching...*",) * (panels - 1) + ("*Waiting for research agents...*",) + ("",) * panels
 
-            # Run research
-            alpha_result, beta_result, gamma_result, analyst_result = await run_research_fn(topic.strip())
+            # Stream each agent into its own panel; the other panels are left untouched
+            async for index, result in run_research_fn(topic.strip()):
+                outputs = [gr.update()] * (2 * panels)
+                outputs[index], outputs[index + panels] = fmt(result)
+                yield tuple(outputs)
 
-            def fmt(result) -> tuple[str, str]:
-                if result.error:
-                    return f"*Error: {result.error}*", f"**Model:** `{result.model}`\n\n---\n\n> {result.error}"
-                return f"*Done — `{result.model}`*", result.response_text
+        async def on_reload():
+            # On the event loop, between requests' client lookups
+            try:
+                names = await reload_fn()
+            except Exception as exc:
+                return (f"*Config reload failed: {exc}*",) + (gr.update(),) * len(headers)
+            return ("*Config reloaded — new runs use the updated agents.*",) + tuple(f"### {name}" for name in names)
 
-            alpha_s, alpha_text = fmt(alpha_result)
-            beta_s, beta_text = fmt(beta_result)
-            gamma_s, gamma_text = fmt(gamma_result)
-            analyst_s, analyst_text = fmt(analyst_result)
-
-            yield (
-                alpha_s, beta_s, gamma_s, analyst_s,
-                alpha_text, beta_text, gamma_text, analyst_text,
-            )
+        if reload_fn is not None:
+            reload_btn.click(fn=on_reload, outputs=[reload_status] + headers)
 
         submit_btn.click(
             fn=on_submit,
             inputs=[topic_input],
-            outputs=[alpha_status, beta_status, gamma_status, analyst_status,
-                     alpha_out, beta_out, gamma_out, analyst_out],
+            outputs=statuses + outs,
         )
         topic_input.submit(
             fn=on_submit,
             inputs=[topic_input],
-            outputs=[alpha_status, beta_status, gamma_status, analyst_status,
-                     alpha_out, beta_out, gamma_out, analyst_out],
+            outputs=statuses + outs,
         )
 
     return demo